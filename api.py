@@ -0,0 +1,238 @@
+# api.py
+# API JSON in sola lettura con le stesse operazioni della dashboard (Classifica Generale e Società).
+# Avvio: uvicorn api:app --host 0.0.0.0 --port 8000
+
+import hashlib
+import json
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from config.settings import EXCEL_FILES, RICERCA_TOLLERANTE, RISULTATI_PER_PAGINA, SHEET_NAME
+from modules.business_logic import (
+    chiave_vista, classifica_societa_dataset, indice_filtri, indice_ricerca, ordinate_in_cache, ordine_del_file,
+    ordine_per_colonna, posizioni_in_cache
+)
+from modules import metriche
+from modules.cache_risultati import risultati
+from modules.classifica_unificata import VISTE, classifica_unificata, ordine_unificato
+from modules.data_loader import carica_tutte
+from modules.watcher import avvia_watcher
+
+# Limite di righe per pagina accettato dall'API
+MAX_PER_PAGINA = 100
+
+# Ordinamenti della Classifica Generale: colonna -> decrescente
+ORDINAMENTI_GENERALE = {'Ranking': False, 'Punti': True, 'Nome': False}
+
+
+class RichiestaNonValida(ValueError):
+    """
+    Parametro della richiesta non valido (risposta 400)
+    """
+
+
+def _intero(params, nome, predefinito, minimo=1, massimo=None):
+    valore = params.get(nome)
+    if valore in (None, ''):
+        return predefinito
+    try:
+        valore = int(valore)
+    except ValueError:
+        raise RichiestaNonValida(f"'{nome}' deve essere un numero intero") from None
+    if valore < minimo or (massimo is not None and valore > massimo):
+        raise RichiestaNonValida(f"'{nome}' fuori dall'intervallo consentito")
+    return valore
+
+
+def _lista(params):
+    lista = params.get('lista') or 'Tutte'
+    if lista != 'Tutte' and lista not in EXCEL_FILES:
+        raise RichiestaNonValida(f"Ranking List '{lista}' sconosciuta")
+    return lista
+
+
+def _etag(versione, request):
+    """
+    ETag della risposta: versione dei dati + parametri della richiesta (in ordine canonico)
+    """
+    parametri = sorted(request.query_params.multi_items())
+    impronta = hashlib.sha1(repr((request.url.path, parametri)).encode()).hexdigest()[:12]
+    return f'"{versione}-{impronta}"'
+
+
+def _non_modificato(request, etag):
+    richiesti = request.headers.get('if-none-match', '')
+    return any(voce.strip() in (etag, f'W/{etag}', '*') for voce in richiesti.split(','))
+
+
+def _risposta(request, versione, genera):
+    """
+    Risposta JSON con ETag: se il client ha già questa versione risponde 304 senza calcolare nulla
+    """
+    etag = _etag(versione, request)
+    intestazioni = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    non_modificato = _non_modificato(request, etag)
+    metriche.conta_cache('api_etag', non_modificato)
+    if non_modificato:
+        return Response(status_code=304, headers=intestazioni)
+    with metriche.fase(f"api_{request.url.path.rsplit('/', 1)[-1]}"):
+        corpo = genera()
+    return Response(corpo, media_type='application/json', headers=intestazioni)
+
+
+def _pagina(totale, pagina, per_pagina):
+    totale_pagine = (totale - 1) // per_pagina + 1 if totale else 1
+    pagina = min(pagina, totale_pagine)
+    return pagina, totale_pagine, (pagina - 1) * per_pagina
+
+
+def _corpo(dati, **campi):
+    """
+    JSON della risposta: metadati + righe della pagina (serializzate da pandas)
+    """
+    testa = json.dumps(campi, ensure_ascii=False)[:-1]
+    righe = dati.to_json(orient='records', force_ascii=False, date_format='iso')
+    return f'{testa}, "dati": {righe}}}'.encode()
+
+
+# --- ENDPOINT ---
+# Funzioni sincrone: Starlette le esegue nel suo threadpool, così caricamento, filtri e serializzazione
+# di una richiesta lenta non bloccano l'event loop e le altre connessioni del worker.
+
+def liste(request):
+    risultato = carica_tutte(sheet_name=SHEET_NAME)
+    return _risposta(request, risultato.versione, lambda: json.dumps({
+        'liste': list(EXCEL_FILES),
+        'mancanti': [mancante.ranking for mancante in risultato.mancanti],
+        'versione': risultato.versione,
+    }).encode())
+
+
+def classifica_generale(request):
+    """
+    Parametri: lista, sesso, categoria, nome, societa, ordina (Ranking, Punti, Nome), pagina, per_pagina;
+    con lista=Tutte anche vista (Miglior posizione, Punti sommati) per avere una riga per atleta
+    """
+    params = request.query_params
+    lista = _lista(params)
+    pagina = _intero(params, 'pagina', 1)
+    per_pagina = _intero(params, 'per_pagina', RISULTATI_PER_PAGINA, massimo=MAX_PER_PAGINA)
+    ordina = params.get('ordina') or None
+    if ordina is not None and ordina not in ORDINAMENTI_GENERALE:
+        raise RichiestaNonValida(f"'ordina' deve essere uno tra {', '.join(ORDINAMENTI_GENERALE)}")
+    vista = params.get('vista') or None
+    if vista is not None and (vista not in VISTE or lista != 'Tutte'):
+        raise RichiestaNonValida(f"'vista' richiede lista=Tutte ed è una tra {', '.join(VISTE)}")
+
+    risultato = carica_tutte(None if lista == 'Tutte' else [lista], sheet_name=SHEET_NAME)
+
+    def genera():
+        df = risultato.dati
+        if df.empty:
+            return _corpo(df, versione=risultato.versione, totale=0, pagina=1, totale_pagine=1)
+        # Le Categorie nel DataFrame sono numeri: il parametro testuale si risolve sulle opzioni dell'indice
+        categorie = {str(valore): valore for valore in indice_filtri(df).opzioni_categoria(None)}
+        categoria = params.get('categoria') or 'Tutte'
+        categoria = categorie.get(categoria, categoria)
+        societa = params.get('societa') or 'Tutte'
+        sesso = params.get('sesso') or 'Tutti'
+        nome = params.get('nome') or ''
+        # Stessa cache dei risultati della dashboard: le viste già chieste da altri non si ricalcolano
+        chiave_cache = chiave_vista(risultato.versione, lista, sesso, categoria, societa, nome)
+        posizioni = posizioni_in_cache(chiave_cache, df, sesso, categoria, nome, societa)
+
+        if vista is not None:
+            unificata = classifica_unificata(df)
+            totale = unificata.totale_atleti(posizioni)
+            pagina_corrente, totale_pagine, inizio = _pagina(totale, pagina, per_pagina)
+            fetta = unificata.atleti(df, vista, posizioni, inizio, inizio + per_pagina)
+            return _corpo(fetta, versione=risultato.versione, totale=totale,
+                          pagina=pagina_corrente, totale_pagine=totale_pagine)
+
+        # Come nella dashboard: con una Società scelta l'ordine di default è per Ranking,
+        # con più liste le righe sono fuse in ordine di Ranking
+        if ordina is None and societa != 'Tutte':
+            chiave = 'Ranking'
+        else:
+            chiave = ordina
+        if chiave is None and lista == 'Tutte':
+            nome_ordine, ordinamento = 'unificato', ordine_unificato(df)
+        elif chiave is None:
+            nome_ordine, ordinamento = 'file', ordine_del_file(df)
+        else:
+            nome_ordine = chiave
+            ordinamento = ordine_per_colonna(df, chiave, ORDINAMENTI_GENERALE[chiave])
+        ordinate = ordinate_in_cache(chiave_cache, nome_ordine, ordinamento, posizioni)
+        pagina_corrente, totale_pagine, inizio = _pagina(len(ordinate), pagina, per_pagina)
+        fetta = df.take(ordinate[inizio:inizio + per_pagina])
+        return _corpo(fetta, versione=risultato.versione, totale=int(len(ordinate)),
+                      pagina=pagina_corrente, totale_pagine=totale_pagine)
+
+    return _risposta(request, risultato.versione, genera)
+
+
+def classifica_societa(request):
+    """
+    Parametri: lista, cerca (nome Società), ordina (Punti Totali, Media Punti, Numero Atleti), pagina, per_pagina
+    """
+    params = request.query_params
+    lista = _lista(params)
+    pagina = _intero(params, 'pagina', 1)
+    per_pagina = _intero(params, 'per_pagina', RISULTATI_PER_PAGINA, massimo=MAX_PER_PAGINA)
+    risultato = carica_tutte(sheet_name=SHEET_NAME)
+    df = risultato.dati
+    ordinamenti = classifica_societa_dataset(df).ORDINAMENTI if not df.empty else ('Punti Totali',)
+    ordina = params.get('ordina') or ordinamenti[0]
+    if ordina not in ordinamenti:
+        raise RichiestaNonValida(f"'ordina' deve essere uno tra {', '.join(ordinamenti)}")
+
+    def genera():
+        if df.empty:
+            return _corpo(df, versione=risultato.versione, totale=0, pagina=1, totale_pagine=1)
+        classifica = classifica_societa_dataset(df)
+        cerca = params.get('cerca') or ''
+        trovate = indice_ricerca(df, 'Società').valori_trovati(cerca, RICERCA_TOLLERANTE)
+        ordine = risultati.ottieni(
+            chiave_vista(risultato.versione, lista, ricerca_nome=cerca) + ('societa', ordina),
+            lambda: classifica.ordine(lista, ordina, trovate)
+        )
+        totale = len(ordine)
+        fetta, pagina_corrente, totale_pagine = classifica.pagina(lista, ordina, trovate, pagina, per_pagina, ordine)
+        return _corpo(fetta, versione=risultato.versione, totale=totale,
+                      pagina=pagina_corrente, totale_pagine=totale_pagine)
+
+    return _risposta(request, risultato.versione, genera)
+
+
+def metriche_prometheus(request):
+    """
+    Metriche di prestazione del processo (vuote se METRICHE_ATTIVE è False)
+    """
+    testo = metriche.testo_prometheus() + risultati.testo_prometheus()
+    return PlainTextResponse(testo, media_type='text/plain; version=0.0.4')
+
+
+async def errore_richiesta(request, errore):
+    return JSONResponse({'errore': str(errore)}, status_code=400)
+
+
+@asynccontextmanager
+async def ciclo_di_vita(app):
+    # Lo stesso watcher della dashboard: dati e indici sono pronti e restano aggiornati
+    avvia_watcher()
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route('/api/liste', liste),
+        Route('/api/classifica-generale', classifica_generale),
+        Route('/api/classifica-societa', classifica_societa),
+        Route('/metrics', metriche_prometheus),
+    ],
+    exception_handlers={RichiestaNonValida: errore_richiesta},
+    lifespan=ciclo_di_vita,
+)
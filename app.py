@@ -1,8 +1,21 @@
 # app.py
 
+import importlib
 import streamlit as st
-from views.tabs import classifica_generale
-from views.tabs_societa import classifica_societa
+from modules.watcher import avvia_watcher
+from modules import metriche
+from config.settings import PANNELLO_PRESTAZIONI, PARAMETRO_PRESTAZIONI
+
+# Schede: etichetta -> (modulo della vista, funzione). I moduli (con plotly, export, storico...)
+# vengono importati solo quando la loro scheda viene aperta per la prima volta nel processo.
+SCHEDE = {
+    "🏆 Classifica Generale": ('views.tabs', 'classifica_generale'),
+    "🏢 Classifica Società": ('views.tabs_societa', 'classifica_societa'),
+    "🏅 Top 10": ('views.tabs_top10', 'top_10'),
+    "🔍 Confronti": ('views.tabs_confronti', 'confronti'),
+    "📈 Movimenti": ('views.tabs_movimenti', 'movimenti_ranking'),
+    "📊 Andamento": ('views.tabs_andamento', 'andamento'),
+}
 
 # --- CONFIGURAZIONE GENERALE ---
 st.set_page_config(
@@ -11,6 +24,15 @@ st.set_page_config(
     initial_sidebar_state='collapsed'
 )
 
+# --- AGGIORNAMENTO AUTOMATICO DELLE RANKING LIST (UNA SOLA VOLTA PER PROCESSO) ---
+avvia_watcher()
+
+# --- METRICHE DELLE PRESTAZIONI (PANNELLO NASCOSTO: ?prestazioni=1, se abilitato) ---
+pannello_prestazioni = PANNELLO_PRESTAZIONI and st.query_params.get(PARAMETRO_PRESTAZIONI) == '1'
+# Si misura solo questo rerun: le altre sessioni, e questa a pannello chiuso, non raccolgono nulla
+metriche.attiva_richiesta(pannello_prestazioni)
+metriche.inizia_traccia()
+
 # --- STILE CSS PER RIMUOVERE MARGINE SUPERIORE ---
 st.markdown("""
     <style>
@@ -89,17 +111,18 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- MENU A TABS ---
-tab1, tab2 = st.tabs(
-    [
-        "🏆 Classifica Generale", 
-        "🏢 Classifica Società"
-    ]
-)
-
-# --- CONTENUTO DELLE SCHEDE ---
-with tab1:
-    classifica_generale()
-
-with tab2:
-    classifica_societa()
-
+# Con on_change='rerun' Streamlit sa quale scheda è aperta: solo quella viene calcolata a ogni rerun
+schede = st.tabs(list(SCHEDE), key="scheda", on_change='rerun')
+
+# --- CONTENUTO DELLA SCHEDA APERTA ---
+for scheda, (modulo, funzione) in zip(schede, SCHEDE.values()):
+    if not scheda.open:
+        continue
+    with scheda, metriche.fase(f"tab_{funzione}"):
+        with metriche.fase(f"import_{modulo}"):
+            vista = getattr(importlib.import_module(modulo), funzione)
+        vista()
+
+if pannello_prestazioni:
+    from views.components.pannello_prestazioni import mostra_pannello
+    mostra_pannello()
@@ -0,0 +1,159 @@
+# avvio_multiprocesso.py
+# Avvia più processi della dashboard (o dell'API) dietro un bilanciatore locale; i dati sono letti una volta
+# per macchina nell'archivio Arrow condiviso (vedi MEMORIA_CONDIVISA in config/settings.py).
+# Uso: python avvio_multiprocesso.py [--worker 4] [--porta 8501] [--api]
+# Lo scaling del throughput con i worker non è ancora verificato su una macchina multi-core (vedi benchmark/carico.py).
+
+import argparse
+import asyncio
+import itertools
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+# Prima di importare i moduli dell'app: anche questo processo usa l'archivio condiviso
+os.environ['RANKING_MEMORIA_CONDIVISA'] = '1'
+
+# Secondi di attesa massima perché un worker accetti connessioni
+ATTESA_AVVIO = 60
+# Byte letti alla volta dal bilanciatore
+DIMENSIONE_BLOCCO = 64 * 1024
+
+
+def comando_worker(porta, api=False):
+    """
+    Comando di un worker sulla porta indicata: Streamlit (app.py) oppure uvicorn (api:app)
+    """
+    if api:
+        return [sys.executable, '-m', 'uvicorn', 'api:app', '--host', '127.0.0.1', '--port', str(porta),
+                '--log-level', 'warning']
+    return [sys.executable, '-m', 'streamlit', 'run', 'app.py', '--server.address', '127.0.0.1',
+            '--server.port', str(porta), '--server.headless', 'true']
+
+
+def attendi_porta(porta, timeout=ATTESA_AVVIO):
+    """
+    Attende che la porta locale accetti connessioni; restituisce False allo scadere del timeout
+    """
+    scadenza = time.monotonic() + timeout
+    while time.monotonic() < scadenza:
+        try:
+            with socket.create_connection(('127.0.0.1', porta), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def avvia_worker(numero, porta_base, api=False):
+    """
+    Avvia `numero` worker sulle porte successive a `porta_base`; restituisce [(porta, processo)]
+    """
+    cartella = os.path.dirname(os.path.abspath(__file__))
+    worker = []
+    for indice in range(numero):
+        porta = porta_base + 1 + indice
+        processo = subprocess.Popen(comando_worker(porta, api), cwd=cartella, env=os.environ.copy())
+        worker.append((porta, processo))
+    for porta, processo in worker:
+        if not attendi_porta(porta):
+            termina(worker)
+            raise RuntimeError(f"Il worker sulla porta {porta} non si è avviato")
+    return worker
+
+
+class Bilanciatore:
+    """
+    Bilanciatore TCP locale: ogni connessione (HTTP o WebSocket di Streamlit) va al worker con meno
+    connessioni aperte e vi resta per tutta la sua durata, quindi una sessione Streamlit non cambia processo
+    """
+
+    def __init__(self, porte):
+        self.porte = list(porte)
+        self.aperte = {porta: 0 for porta in self.porte}
+        self._giro = itertools.count()
+
+    def _scegli(self):
+        # A parità di connessioni aperte si alternano i worker
+        scostamento = next(self._giro)
+        ordine = self.porte[scostamento % len(self.porte):] + self.porte[:scostamento % len(self.porte)]
+        return sorted(ordine, key=lambda porta: self.aperte[porta])
+
+    @staticmethod
+    async def _copia(lettore, scrittore):
+        try:
+            while True:
+                dati = await lettore.read(DIMENSIONE_BLOCCO)
+                if not dati:
+                    break
+                scrittore.write(dati)
+                await scrittore.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            scrittore.close()
+
+    async def gestisci(self, lettore_client, scrittore_client):
+        for porta in self._scegli():
+            try:
+                lettore_worker, scrittore_worker = await asyncio.open_connection('127.0.0.1', porta)
+                break
+            except OSError:
+                # Worker non raggiungibile: si prova il successivo
+                continue
+        else:
+            scrittore_client.close()
+            return
+        self.aperte[porta] += 1
+        try:
+            await asyncio.gather(
+                self._copia(lettore_client, scrittore_worker),
+                self._copia(lettore_worker, scrittore_client),
+            )
+        finally:
+            self.aperte[porta] -= 1
+
+    async def servi(self, porta):
+        server = await asyncio.start_server(self.gestisci, '0.0.0.0', porta)
+        async with server:
+            await server.serve_forever()
+
+
+def _interrompi(*_):
+    raise KeyboardInterrupt
+
+
+def termina(worker):
+    for _, processo in worker:
+        processo.terminate()
+    for _, processo in worker:
+        try:
+            processo.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Avvia più worker della dashboard dietro un bilanciatore locale")
+    parser.add_argument('--worker', type=int, default=os.cpu_count() or 1, help="numero di processi (default: CPU)")
+    parser.add_argument('--porta', type=int, default=8501, help="porta del bilanciatore; i worker usano le successive")
+    parser.add_argument('--api', action='store_true', help="avvia l'API JSON (uvicorn api:app) invece della dashboard")
+    args = parser.parse_args()
+
+    # Ogni lista viene letta una volta sola, qui; i worker mappano l'archivio già pronto
+    from modules.data_loader import prepara_archivi
+    prepara_archivi()
+
+    worker = avvia_worker(args.worker, args.porta, args.api)
+    # SIGTERM come Ctrl+C: i worker vengono sempre chiusi
+    signal.signal(signal.SIGTERM, _interrompi)
+    print(f"🚀 {len(worker)} worker ({'API' if args.api else 'dashboard'}) su http://localhost:{args.porta}", flush=True)
+    try:
+        asyncio.run(Bilanciatore(porta for porta, _ in worker).servi(args.porta))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        termina(worker)
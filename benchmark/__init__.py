@@ -0,0 +1,3 @@
+# benchmark/__init__.py
+# Benchmark dei percorsi di caricamento, filtro, aggregazione, rendering ed export su dati sintetici.
+# Uso: python -m benchmark --atleti 1000 10000 [--salva-baseline]
@@ -0,0 +1,85 @@
+# benchmark/__main__.py
+# Uso: python -m benchmark --atleti 1000 10000 [--ripetizioni 20] [--salva-baseline] [--soglia 1.25]
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from benchmark.dati_sintetici import workbook_sintetico
+from benchmark.misure import esegui_scenari
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def carica_baseline(percorso=BASELINE):
+    if not os.path.isfile(percorso):
+        return {}
+    with open(percorso, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def salva_baseline(baseline, percorso=BASELINE):
+    temporaneo = f"{percorso}.tmp"
+    with open(temporaneo, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True, ensure_ascii=False)
+    os.replace(temporaneo, percorso)
+
+
+def confronta(misure, riferimento, soglia):
+    """
+    Stampa le misure con il rapporto p50 rispetto alla baseline; restituisce gli scenari più lenti della soglia
+    """
+    regressioni = []
+    print(f"{'scenario':<36}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'picco MB':>10}{'vs base':>10}")
+    for m in misure:
+        base = riferimento.get(m.scenario)
+        rapporto = m.p50 / base['p50'] if base and base['p50'] > 0 else None
+        segnale = ''
+        if rapporto is not None and rapporto > soglia:
+            segnale = ' ⚠️'
+            regressioni.append(m.scenario)
+        confronto = f"{rapporto:.2f}x" if rapporto is not None else '-'
+        print(f"{m.scenario:<36}{m.p50:>10.2f}{m.p95:>10.2f}{m.p99:>10.2f}{m.picco_mb:>10.1f}{confronto:>10}{segnale}")
+    return regressioni
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark della dashboard su Ranking List sintetiche")
+    parser.add_argument('--atleti', type=int, nargs='+', default=[1000, 10000],
+                        help="dimensioni delle liste sintetiche (es. 1000 100000 1000000)")
+    parser.add_argument('--ripetizioni', type=int, default=20)
+    parser.add_argument('--seme', type=int, default=0)
+    parser.add_argument('--cartella', default=os.path.join(tempfile.gettempdir(), 'ranking_benchmark'),
+                        help="dove generare (e riusare) i workbook sintetici")
+    parser.add_argument('--soglia', type=float, default=1.25,
+                        help="rapporto p50 oltre il quale uno scenario è segnalato come regressione")
+    parser.add_argument('--salva-baseline', action='store_true', help="salva le misure come nuova baseline")
+    args = parser.parse_args()
+
+    baseline = carica_baseline()
+    regressioni = []
+    for atleti in args.atleti:
+        inizio = time.perf_counter()
+        file_path = workbook_sintetico(args.cartella, atleti, args.seme)
+        print(f"\n📊 {atleti} atleti ({file_path}, pronto in {time.perf_counter() - inizio:.1f}s)")
+        misure = esegui_scenari(file_path, args.ripetizioni, args.seme)
+        regressioni += [f"{atleti}: {scenario}" for scenario in
+                        confronta(misure, baseline.get(str(atleti), {}), args.soglia)]
+        if args.salva_baseline:
+            baseline[str(atleti)] = {
+                m.scenario: {'p50': round(m.p50, 3), 'p95': round(m.p95, 3), 'picco_mb': round(m.picco_mb, 2)}
+                for m in misure
+            }
+
+    picco_processo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n📦 Memoria massima del processo: {picco_processo:.0f} MB")
+    if args.salva_baseline:
+        salva_baseline(baseline)
+        print(f"✅ Baseline salvata in {BASELINE}")
+    if regressioni:
+        print("⚠️ Scenari più lenti della baseline: " + "; ".join(regressioni))
+        sys.exit(1)
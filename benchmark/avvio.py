@@ -0,0 +1,115 @@
+# benchmark/avvio.py
+# Profilo dell'avvio a freddo della dashboard: tempi di import per pacchetto, primo render, rerun
+# e prima apertura di ogni scheda, misurati in un processo Python nuovo (come un'istanza appena avviata).
+# Uso: python -m benchmark.avvio [--import-mostrati 15] [--json profilo.json]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Eseguito nel processo nuovo: l'output JSON va su stdout, i tempi di import (-X importtime) su stderr
+_SCRIPT = r'''
+import json, sys, time
+inizio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+import_streamlit = time.perf_counter() - inizio
+print('@@app', file=sys.stderr, flush=True)
+
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.query_params['prestazioni'] = '1'
+inizio = time.perf_counter()
+at.run()
+primo_render = time.perf_counter() - inizio
+errori = [e.message for e in at.exception]
+
+inizio = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - inizio
+
+schede = {}
+for scheda in [tab.label for tab in at.tabs][1:]:
+    at.session_state['scheda'] = scheda
+    inizio = time.perf_counter()
+    at.run()
+    schede[scheda] = time.perf_counter() - inizio
+    errori += [e.message for e in at.exception]
+
+from modules import metriche
+fasi, _ = metriche.riepilogo()
+print(json.dumps({
+    'import_streamlit': import_streamlit, 'primo_render': primo_render, 'rerun': rerun,
+    'schede': schede, 'fasi': fasi, 'errori': errori,
+}))
+'''
+
+
+def _import_per_pacchetto(righe):
+    """
+    Dalle righe di -X importtime (dopo il marcatore '@@app'): millisecondi cumulativi per pacchetto di primo livello
+    """
+    pacchetti = {}
+    dopo_marcatore = False
+    for riga in righe:
+        if riga.strip() == '@@app':
+            dopo_marcatore = True
+            continue
+        if not dopo_marcatore or not riga.startswith('import time:') or 'cumulative' in riga:
+            continue
+        _, _, cumulativo, nome = riga.replace('import time:', '|', 1).split('|')
+        # Solo gli import di primo livello (nome non indentato): il cumulativo include già i figli
+        if not nome[1:].startswith(' ') and cumulativo.strip().isdigit():
+            pacchetto = nome.strip().split('.')[0]
+            pacchetti[pacchetto] = pacchetti.get(pacchetto, 0) + int(cumulativo.strip()) / 1000
+    return pacchetti
+
+
+def profila_avvio():
+    """
+    Esegue l'app in un processo nuovo e restituisce il profilo dell'avvio (dict)
+    """
+    cartella = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    esito = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _SCRIPT, os.path.join(cartella, 'app.py')],
+        cwd=cartella, capture_output=True, text=True,
+        env={**os.environ, 'PYTHONPATH': cartella, 'RANKING_PANNELLO_PRESTAZIONI': '1'}
+    )
+    if esito.returncode != 0:
+        raise RuntimeError(esito.stderr[-2000:])
+    profilo = json.loads(esito.stdout.strip().splitlines()[-1])
+    profilo['import_app'] = _import_per_pacchetto(esito.stderr.splitlines())
+    return profilo
+
+
+def stampa(profilo, import_mostrati):
+    print(f"📦 Import di Streamlit (framework):   {profilo['import_streamlit'] * 1000:>8.0f} ms")
+    print(f"🚀 Primo render (import app + dati):   {profilo['primo_render'] * 1000:>8.0f} ms")
+    print(f"🔁 Rerun successivo:                   {profilo['rerun'] * 1000:>8.0f} ms")
+
+    print("\nImport durante il primo render e le aperture delle schede (ms cumulativi per pacchetto):")
+    for pacchetto, ms in sorted(profilo['import_app'].items(), key=lambda voce: -voce[1])[:import_mostrati]:
+        print(f"  {pacchetto:<32}{ms:>10.1f}")
+
+    print("\nPrima apertura di ogni scheda (import della vista compreso):")
+    for scheda, secondi in profilo['schede'].items():
+        print(f"  {scheda:<32}{secondi * 1000:>10.0f} ms")
+
+    print("\nFasi misurate (ms totali):")
+    for fase in sorted(profilo['fasi'], key=lambda voce: -voce['ms_totali'])[:import_mostrati]:
+        print(f"  {fase['fase']:<40}{fase['ms_totali']:>10.1f}  ({fase['chiamate']} chiamate)")
+    if profilo['errori']:
+        print("\n⚠️ Errori: " + "; ".join(profilo['errori']))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Profilo dell'avvio a freddo della dashboard")
+    parser.add_argument('--import-mostrati', type=int, default=15, help="righe mostrate per import e fasi")
+    parser.add_argument('--json', help="salva il profilo completo in questo file")
+    args = parser.parse_args()
+
+    profilo = profila_avvio()
+    stampa(profilo, args.import_mostrati)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(profilo, f, indent=2, ensure_ascii=False)
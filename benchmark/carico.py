@@ -0,0 +1,118 @@
+# benchmark/carico.py
+# Test di carico della modalità multi-processo: throughput dell'API dietro il bilanciatore al variare dei worker.
+# Uso: python -m benchmark.carico [--worker 1 2 4] [--client 16] [--durata 10] [--salva]
+# Con --salva le misure vanno in benchmark/carico.json, indicizzate per numero di CPU della macchina.
+# Punto aperto: lo scaling quasi lineare con i worker va ancora verificato su una macchina multi-core;
+# le misure registrate finora vengono da un host con una sola CPU, dove più worker non possono scalare.
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from avvio_multiprocesso import attendi_porta
+from benchmark.__main__ import carica_baseline, salva_baseline
+
+RISULTATI = os.path.join(os.path.dirname(__file__), 'carico.json')
+
+# Richieste che calcolano davvero (viste per atleta, pagine diverse): nessuna si risolve con un 304
+PERCORSI = [
+    f"/api/classifica-generale?vista={vista}&pagina={pagina}&per_pagina=50"
+    for vista in ('Punti%20sommati', 'Miglior%20posizione') for pagina in range(1, 21)
+]
+
+
+def client(porta, durata, seme):
+    """
+    Un client con connessione persistente: invia richieste fino allo scadere di `durata`;
+    restituisce (richieste riuscite, errori, latenze in ms)
+    """
+    rng = np.random.default_rng(seme)
+    connessione = http.client.HTTPConnection('127.0.0.1', porta, timeout=30)
+    riuscite, errori, latenze = 0, 0, []
+    fine = time.monotonic() + durata
+    while time.monotonic() < fine:
+        inizio = time.perf_counter()
+        try:
+            connessione.request('GET', PERCORSI[rng.integers(len(PERCORSI))])
+            risposta = connessione.getresponse()
+            risposta.read()
+            if risposta.status == 200:
+                riuscite += 1
+                latenze.append((time.perf_counter() - inizio) * 1000)
+            else:
+                errori += 1
+        except (OSError, http.client.HTTPException):
+            errori += 1
+            connessione.close()
+            connessione = http.client.HTTPConnection('127.0.0.1', porta, timeout=30)
+    connessione.close()
+    return riuscite, errori, latenze
+
+
+def misura_carico(worker, porta, client_totali, durata):
+    """
+    Avvia il bilanciatore con `worker` processi API, lo carica con `client_totali` client per `durata`
+    secondi e restituisce (richieste al secondo, errori, p50 ms, p95 ms)
+    """
+    cartella = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    avvio = subprocess.Popen(
+        [sys.executable, 'avvio_multiprocesso.py', '--api', '--worker', str(worker), '--porta', str(porta)],
+        cwd=cartella, stdout=subprocess.DEVNULL
+    )
+    try:
+        if not attendi_porta(porta):
+            raise RuntimeError("Il bilanciatore non si è avviato")
+        # Riscaldamento: ogni worker costruisce le proprie strutture prima della misura
+        client(porta, 2, 0)
+        with ProcessPoolExecutor(max_workers=client_totali) as pool:
+            esiti = list(pool.map(client, [porta] * client_totali, [durata] * client_totali,
+                                  range(1, client_totali + 1)))
+    finally:
+        avvio.terminate()
+        avvio.wait()
+    riuscite = sum(esito[0] for esito in esiti)
+    errori = sum(esito[1] for esito in esiti)
+    latenze = np.concatenate([np.asarray(esito[2]) for esito in esiti]) if riuscite else np.zeros(1)
+    p50, p95 = np.percentile(latenze, [50, 95])
+    return riuscite / durata, errori, float(p50), float(p95)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Throughput dell'API con più worker dietro il bilanciatore locale")
+    parser.add_argument('--worker', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--client', type=int, default=16, help="client concorrenti (processi)")
+    parser.add_argument('--durata', type=float, default=10, help="secondi di carico per ogni configurazione")
+    parser.add_argument('--porta', type=int, default=8600)
+    parser.add_argument('--salva', action='store_true', help=f"registra le misure in {RISULTATI}")
+    args = parser.parse_args()
+
+    cpu = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    print(f"🖥️ CPU disponibili: {cpu}")
+    if max(args.worker) > cpu:
+        print(f"⚠️ Con {cpu} CPU le configurazioni con più di {cpu} worker non possono scalare: "
+              "lo scaling non è dimostrato da questa misura.")
+    print(f"{'worker':>8}{'req/s':>10}{'speedup':>10}{'efficienza':>12}{'p50 ms':>10}{'p95 ms':>10}{'errori':>8}")
+    base = None
+    misure = {}
+    for worker in args.worker:
+        throughput, errori, p50, p95 = misura_carico(worker, args.porta, args.client, args.durata)
+        base = base or throughput
+        speedup = throughput / base
+        efficienza = speedup / worker * args.worker[0]
+        print(f"{worker:>8}{throughput:>10.1f}{speedup:>9.2f}x{efficienza:>11.0%}"
+              f"{p50:>10.1f}{p95:>10.1f}{errori:>8}", flush=True)
+        misure[str(worker)] = {'req_s': round(throughput, 1), 'speedup': round(speedup, 2),
+                               'efficienza': round(efficienza, 2), 'p50': round(p50, 1), 'p95': round(p95, 1),
+                               'errori': errori, 'oltre_le_cpu': worker > cpu}
+
+    if args.salva:
+        risultati = carica_baseline(RISULTATI)
+        risultati[str(cpu)] = {'client': args.client, 'durata': args.durata, 'worker': misure}
+        salva_baseline(risultati, RISULTATI)
+        print(f"✅ Misure salvate in {RISULTATI}")
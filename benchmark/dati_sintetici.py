@@ -0,0 +1,117 @@
+# benchmark/dati_sintetici.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Categorie di peso per sesso, con la quota di atleti di ciascuna (più affollate le centrali)
+CATEGORIE = {
+    'M': ([-46, -50, -55, -60, -66, -73, -81, -90, 90, -100, 100],
+          [4, 6, 9, 13, 16, 16, 13, 9, 3, 7, 4]),
+    'F': ([-40, -44, -48, -52, -57, -63, -70, 70, -78, 78],
+          [5, 8, 12, 15, 16, 15, 12, 3, 9, 5]),
+}
+# Nazioni diverse dall'Italia (rare, come nelle liste reali)
+NAZIONI_ESTERE = ['SLO', 'CRO', 'AUT', 'SUI', 'FRA', 'GER', 'ESP', 'SRB', 'BIH', 'HUN']
+COGNOMI = ['ROSSI', 'RUSSO', 'FERRARI', 'ESPOSITO', 'BIANCHI', 'ROMANO', 'COLOMBO', 'RICCI', 'MARINO', 'GRECO',
+           'BRUNO', 'GALLO', 'CONTI', 'DE LUCA', 'MANCINI', 'COSTA', 'GIORDANO', 'RIZZO', 'LOMBARDI', 'MORETTI',
+           'D\'ANGELO', 'FONTANA', 'CARUSO', 'MARTINELLI', 'LEONE', 'SANTORO', 'MARINI', 'LONGO', 'GATTI', 'SALA']
+NOMI = {
+    'M': ['LUCA', 'MARCO', 'ANDREA', 'MATTEO', 'FRANCESCO', 'ALESSANDRO', 'DAVIDE', 'LORENZO', 'GIOVANNI',
+          'FEDERICO', 'SIMONE', 'RICCARDO', 'NICOLÒ', 'GABRIELE', 'TOMMASO', 'EMILIANO', 'RAFFAELE', 'MASSIMO'],
+    'F': ['GIULIA', 'SOFIA', 'AURORA', 'ALICE', 'GINEVRA', 'EMMA', 'GIORGIA', 'MARTINA', 'CHIARA', 'SARA',
+          'FRANCESCA', 'ELISA', 'BEATRICE', 'ANNA', 'ASIA', 'NOEMI', 'ILARIA', 'VALENTINA'],
+}
+PROVINCE = ['RM', 'NA', 'MI', 'TO', 'SS', 'FI', 'BO', 'PA', 'BA', 'VE', 'GE', 'CT', 'PD', 'BS', 'TS']
+FORME_SOCIETA = ['A.S.D.', 'ASSOCIAZIONE SPORTIVA DILETTANTISTICA', 'JUDO CLUB', 'POLISPORTIVA', 'S.S.D.', 'G.S.']
+
+
+def _distribuzione(rng, n, classi):
+    """
+    Indici di classe estratti con probabilità di tipo Zipf (poche classi grandi, molte piccole)
+    """
+    pesi = 1.0 / np.arange(1, classi + 1) ** 1.1
+    return rng.choice(classi, size=n, p=pesi / pesi.sum())
+
+
+def genera_ranking(atleti, seme=0):
+    """
+    DataFrame sintetico con le colonne di una Ranking List reale
+    (Categoria, Nome, Data Nascita, Nazione, Sesso, Società, Codice Società, Ranking, Punti, Bonus, gare)
+    """
+    rng = np.random.default_rng(seme)
+    sesso = np.where(rng.random(atleti) < 0.62, 'M', 'F')
+    categoria = np.empty(atleti, dtype=np.int64)
+    nome = np.empty(atleti, dtype=object)
+    for valore, (categorie, quote) in CATEGORIE.items():
+        maschera = sesso == valore
+        quote = np.array(quote, dtype=float)
+        categoria[maschera] = rng.choice(categorie, size=maschera.sum(), p=quote / quote.sum())
+        cognomi = rng.choice(COGNOMI, size=maschera.sum())
+        nomi = rng.choice(NOMI[valore], size=maschera.sum())
+        nome[maschera] = [f"{c} {n}" for c, n in zip(cognomi, nomi)]
+
+    # Circa 7-8 atleti per società in media, con distribuzione molto asimmetrica come nei dati reali
+    numero_societa = max(1, atleti // 7)
+    indice_societa = _distribuzione(rng, atleti, numero_societa)
+    forme = rng.choice(FORME_SOCIETA, size=numero_societa)
+    province = rng.choice(PROVINCE, size=numero_societa)
+    nomi_societa = np.array([f"{forma} JUDO {i:05d}" for i, forma in enumerate(forme)], dtype=object)
+    codici_societa = np.array(
+        [f"{10 + i % 10}{provincia}{i:04d}" for i, provincia in enumerate(province)], dtype=object
+    )
+
+    nazione = np.where(rng.random(atleti) < 0.98, 'IT', rng.choice(NAZIONI_ESTERE, size=atleti))
+    # Punti a coda lunga: mediana bassa, pochi atleti con punteggi molto alti
+    punti = np.clip(np.round(rng.lognormal(2.0, 1.3, atleti)), 1, 20000).astype(np.int64)
+    nascita = pd.Timestamp('2005-01-01') + pd.to_timedelta(rng.integers(0, 4 * 365, atleti), unit='D')
+
+    df = pd.DataFrame({
+        'Categoria': categoria,
+        'Nome': nome,
+        'Data Nascita': nascita,
+        'Nazione': nazione,
+        'Sesso': sesso,
+        'Società': nomi_societa[indice_societa],
+        'Codice Società': codici_societa[indice_societa],
+        'Punti': punti,
+        'Bonus2024': rng.integers(0, 100, atleti),
+        'Bonus2023': rng.integers(0, 100, atleti),
+        'GPAlpeAdria': np.where(rng.random(atleti) < 0.2, rng.integers(0, 100, atleti), 0).astype(float),
+        'ECGenova': np.where(rng.random(atleti) < 0.1, rng.integers(0, 100, atleti), 0).astype(float),
+    })
+    # Ranking per Sesso e Categoria, come nelle liste ufficiali
+    df['Ranking'] = df.groupby(['Sesso', 'Categoria'])['Punti'].rank(ascending=False, method='min').astype(np.int64)
+    df = df.sort_values(['Sesso', 'Categoria', 'Ranking'], kind='stable').reset_index(drop=True)
+    colonne = ['Categoria', 'Nome', 'Data Nascita', 'Nazione', 'Sesso', 'Società', 'Codice Società',
+               'Ranking', 'Punti', 'Bonus2024', 'Bonus2023', 'GPAlpeAdria', 'ECGenova']
+    return df[colonne]
+
+
+def scrivi_workbook(df, file_path, sheet_name='Sheet1'):
+    """
+    Scrive il DataFrame come workbook Excel (xlsxwriter in constant_memory, adatto anche a 1M righe)
+    """
+    import xlsxwriter
+
+    temporaneo = f"{file_path}.tmp"
+    workbook = xlsxwriter.Workbook(temporaneo, {'constant_memory': True, 'default_date_format': 'dd/mm/yyyy'})
+    foglio = workbook.add_worksheet(sheet_name)
+    foglio.write_row(0, 0, list(df.columns))
+    for riga, valori in enumerate(df.astype(object).itertuples(index=False, name=None), start=1):
+        foglio.write_row(riga, 0, [valore.to_pydatetime() if isinstance(valore, pd.Timestamp) else valore
+                                   for valore in valori])
+    workbook.close()
+    os.replace(temporaneo, file_path)
+
+
+def workbook_sintetico(cartella, atleti, seme=0):
+    """
+    Percorso di un workbook sintetico con `atleti` righe, generato solo se non esiste già
+    """
+    os.makedirs(cartella, exist_ok=True)
+    file_path = os.path.join(cartella, f"RL_sintetica_{atleti}_{seme}.xlsx")
+    if not os.path.isfile(file_path):
+        scrivi_workbook(genera_ranking(atleti, seme), file_path)
+    return file_path
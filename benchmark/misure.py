@@ -0,0 +1,171 @@
+# benchmark/misure.py
+
+import gc
+import os
+import time
+import tracemalloc
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import COLONNE_DASHBOARD
+from modules import data_loader
+from modules.business_logic import ClassificaSocieta, IndiceFiltri, applica_filtri, indice_filtri, paginazione
+from modules.classifica_unificata import MIGLIOR_POSIZIONE, PUNTI_SOMMATI, ClassificaUnificata, classifica_unificata
+from modules.exporter import esporta_excel
+from views.components.cards import html_card_atleti
+
+# Esito di uno scenario: latenze in millisecondi e picco di memoria allocata in MB
+Misura = namedtuple('Misura', ['scenario', 'ripetizioni', 'p50', 'p95', 'p99', 'media', 'picco_mb'])
+
+# Scenari lenti (letture da Excel) ripetuti al massimo questo numero di volte
+MAX_RIPETIZIONI_LENTE = 3
+
+
+def misura(scenario, funzione, ripetizioni, prepara=None):
+    """
+    Esegue `funzione` `ripetizioni` volte (dopo un giro di riscaldamento) e ne misura le latenze;
+    il picco di memoria si misura in un giro a parte, così tracemalloc non altera i tempi.
+    `prepara` viene chiamata prima di ogni giro, fuori dalla misura.
+    """
+    prepara = prepara or (lambda: None)
+    prepara()
+    funzione()
+
+    tempi = []
+    for _ in range(ripetizioni):
+        prepara()
+        gc.collect()
+        inizio = time.perf_counter()
+        funzione()
+        tempi.append((time.perf_counter() - inizio) * 1000)
+
+    prepara()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funzione()
+        _, picco = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(tempi, [50, 95, 99])
+    return Misura(scenario, ripetizioni, float(p50), float(p95), float(p99), float(np.mean(tempi)),
+                  picco / 1024 / 1024)
+
+
+def _combinazioni_filtri(df, quante, seme):
+    """
+    Combinazioni di filtri realistiche estratte dai valori presenti nel dataset
+    """
+    rng = np.random.default_rng(seme)
+    categorie = df['Categoria'].unique().tolist()
+    societa = df['Società'].unique().tolist()
+    nomi = df['Nome'].str.split().str[0].unique().tolist()
+    combinazioni = []
+    for _ in range(quante):
+        combinazioni.append({
+            'sesso': rng.choice(['Tutti', 'Maschi', 'Femmine']),
+            'categoria': categorie[rng.integers(len(categorie))] if rng.random() < 0.6 else 'Tutte',
+            'ricerca_nome': nomi[rng.integers(len(nomi))][:4].lower() if rng.random() < 0.3 else '',
+            'societa': societa[rng.integers(len(societa))] if rng.random() < 0.3 else 'Tutte',
+        })
+    return combinazioni
+
+
+def _due_liste(df):
+    """
+    Due liste sintetiche dallo stesso DataFrame: la seconda con un atleta su due (Punti sommati pieni di parità)
+    """
+    combinato = pd.concat([df, df.iloc[::2]], ignore_index=True)
+    combinato[data_loader.COLONNA_LISTA] = pd.Categorical(['A'] * len(df) + ['B'] * (len(combinato) - len(df)))
+    return combinato
+
+
+def verifica_pagine_unificate(classifica, per_pagina=10):
+    """
+    Le pagine della vista Punti sommati, unite, devono dare l'ordine completo: nessun atleta ripetuto o saltato
+    anche quando molti atleti hanno gli stessi Punti al confine di una pagina
+    """
+    completo = classifica.scelta(PUNTI_SOMMATI)
+    pagine = [classifica.scelta(PUNTI_SOMMATI, None, inizio, inizio + per_pagina)
+              for inizio in range(0, len(completo), per_pagina)]
+    unite = np.concatenate(pagine) if pagine else completo
+    if not np.array_equal(unite, completo):
+        raise AssertionError("Le pagine di 'Punti sommati' non ricompongono l'ordine completo")
+
+
+def esegui_scenari(file_path, ripetizioni=20, seme=0):
+    """
+    Misura i percorsi principali della dashboard sul workbook indicato; restituisce una lista di Misura
+    """
+    sidecar = data_loader.percorso_sidecar(file_path)
+    misure = []
+
+    # --- CARICAMENTO ---
+    def senza_cache():
+        data_loader.svuota_cache()
+
+    def senza_sidecar():
+        senza_cache()
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+
+    carica = lambda: data_loader.carica_dati(file_path)  # noqa: E731
+    misure.append(misura('carica_dati (Excel)', carica, min(ripetizioni, MAX_RIPETIZIONI_LENTE), senza_sidecar))
+    # Lettura in streaming limitata alle colonne delle viste (memoria di picco legata al blocco)
+    misure.append(misura(
+        'lettura Excel (colonne dashboard)',
+        lambda: data_loader.leggi_excel_streaming(file_path, colonne=COLONNE_DASHBOARD),
+        min(ripetizioni, MAX_RIPETIZIONI_LENTE)
+    ))
+    # L'ultimo giro ha rigenerato il sidecar: da qui in poi si legge il Parquet
+    carica()
+    misure.append(misura('carica_dati (sidecar)', carica, ripetizioni, senza_cache))
+    misure.append(misura('carica_dati (cache)', carica, ripetizioni))
+    df = carica()
+
+    # --- FILTRI E PAGINAZIONE ---
+    misure.append(misura('indice_filtri (costruzione)', lambda: IndiceFiltri(df), ripetizioni))
+    indice_filtri(df)
+    combinazioni = iter(_combinazioni_filtri(df, ripetizioni + 3, seme))
+    misure.append(misura('applica_filtri', lambda: applica_filtri(df, **next(combinazioni)), ripetizioni))
+
+    rng = np.random.default_rng(seme)
+    pagine = (len(df) - 1) // 10 + 1
+    misure.append(misura('paginazione', lambda: paginazione(df, int(rng.integers(1, pagine + 1)), 10), ripetizioni))
+
+    # --- CLASSIFICA SOCIETÀ ---
+    misure.append(misura('classifica società (groupby)', lambda: ClassificaSocieta(df), ripetizioni))
+    classifica = ClassificaSocieta(df)
+    pagine_societa = classifica.pagina()[2]
+    misure.append(misura(
+        'classifica società (pagina)',
+        lambda: classifica.pagina(None, 'Punti Totali', None, int(rng.integers(1, pagine_societa + 1)), 10),
+        ripetizioni
+    ))
+
+    # --- RENDERING ED EXPORT ---
+    pagina = df.iloc[:10]
+    misure.append(misura('card HTML (10 atleti)', lambda: html_card_atleti(pagina), ripetizioni))
+    # Export di una vista tipica: la Categoria maschile più numerosa
+    categoria = df.loc[df['Sesso'] == 'M', 'Categoria'].mode().iloc[0]
+    vista = applica_filtri(df, sesso='Maschi', categoria=categoria)
+    misure.append(misura('esporta_excel (una Categoria)', lambda: esporta_excel(vista), min(ripetizioni, 5)))
+    # Vista unificata di due liste: chi manca in una lista ha Ranking e Punti vuoti (pd.NA) per quella lista
+    combinato = _due_liste(vista)
+    unificata = classifica_unificata(combinato).atleti(combinato, MIGLIOR_POSIZIONE)
+    misure.append(misura('esporta_excel (vista unificata)', lambda: esporta_excel(unificata), min(ripetizioni, 5)))
+
+    # --- CLASSIFICA UNIFICATA ---
+    classifica = ClassificaUnificata(_due_liste(df))
+    verifica_pagine_unificate(classifica)
+    pagine_somme = (classifica.numero_atleti - 1) // 10 + 1
+
+    def pagina_somme():
+        inizio = 10 * int(rng.integers(pagine_somme))
+        return classifica.scelta(PUNTI_SOMMATI, None, inizio, inizio + 10)
+
+    misure.append(misura('unificata Punti sommati (pagina)', pagina_somme, ripetizioni))
+    return misure
@@ -1,5 +1,7 @@
 # config/settings.py
 
+import os
+
 EXCEL_FILES = {
     'U15': 'data/RL_U15.xlsx',
     'U18': 'data/RL_U18.xlsx',
@@ -10,3 +12,65 @@ EXCEL_FILES = {
 SHEET_NAME = 'Sheet1'
 RISULTATI_PER_PAGINA = 10
 CACHE_TTL = 600  # Cache per 10 minuti
+
+# Sidecar colonnare (Parquet) generato accanto a ogni file Excel
+USA_SIDECAR = True
+COLONNE_CATEGORICHE = ['Sesso', 'Categoria', 'Nazione', 'Società', 'Codice Società']
+
+# Schema delle Ranking List: colonne richieste, intere e nomi alternativi usati nei vari file
+COLONNE_OBBLIGATORIE = ['Ranking', 'Nome', 'Categoria', 'Sesso', 'Nazione', 'Punti']
+COLONNE_INTERE = ['Ranking', 'Punti']
+ALIAS_COLONNE = {
+    'Data di Nascita': 'Data Nascita',
+    'Bonus 2024': 'Bonus2024',
+    'Bonus 2023': 'Bonus2023',
+}
+
+# Modalità multi-processo (avvio_multiprocesso.py): i dati letti vengono salvati in un archivio colonnare
+# Arrow accanto all'Excel e mappati in memoria, così le pagine sono condivise da tutti i processi della macchina
+MEMORIA_CONDIVISA = os.environ.get('RANKING_MEMORIA_CONDIVISA') == '1'
+
+# Lettura degli Excel in streaming (openpyxl in sola lettura, a blocchi di righe): la memoria di picco
+# dipende dalla dimensione del blocco e non da quella del file
+RIGHE_PER_BLOCCO = 5000
+# Colonne usate dalle viste della dashboard; COLONNE_LETTE = COLONNE_DASHBOARD legge solo queste
+# (None legge tutte le colonne, necessarie all'export completo e all'identità per Data Nascita)
+COLONNE_DASHBOARD = ['Ranking', 'Nome', 'Categoria', 'Società', 'Punti', 'Nazione', 'Sesso']
+COLONNE_LETTE = None
+
+# Numero massimo di Ranking List lette in parallelo (condiviso da tutte le sessioni)
+MAX_WORKER_CARICAMENTO = 4
+
+# Ricerca per nome: se non ci sono risultati esatti accetta piccoli errori di battitura
+RICERCA_TOLLERANTE = True
+
+# Bandiere servite localmente (nessuna richiesta a CDN esterne durante il rendering)
+CARTELLA_BANDIERE = 'static/images/bandiere'
+MAPPA_BANDIERE = 'static/images/bandiere.json'
+
+# Memoria massima (in byte) per i file esportati tenuti in cache
+EXPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Watcher dei file in data/: ricarica in background le Ranking List sostituite
+WATCHER_ATTIVO = True
+INTERVALLO_WATCHER = 5  # secondi tra due controlli
+
+# Storico delle Ranking List: uno snapshot Parquet per lista a ogni nuova versione importata
+CARTELLA_STORICO = 'data/storico'
+# Serie pre-aggregate per Società, una per lista e snapshot (stesso partizionamento dello storico)
+CARTELLA_STORICO_SOCIETA = 'data/storico_societa'
+
+# Cache condivisa dei risultati delle viste (posizioni delle righe): numero massimo di voci e di byte
+RISULTATI_CACHE_MAX_VOCI = 1024
+RISULTATI_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Prefetch in background delle viste vicine (pagine adiacenti, altre Categorie) nella cache dei risultati
+PREFETCH_ATTIVO = True
+PREFETCH_WORKER = 2
+
+# Metriche delle prestazioni (tempi per fase, righe, cache, memoria) raccolte per tutto il processo
+METRICHE_ATTIVE = False
+# Pannello nascosto delle prestazioni: disponibile solo se abilitato (RANKING_PANNELLO_PRESTAZIONI=1);
+# misura soltanto i rerun della sessione che lo apre con il parametro dell'URL (es. ?prestazioni=1)
+PANNELLO_PRESTAZIONI = os.environ.get('RANKING_PANNELLO_PRESTAZIONI') == '1'
+PARAMETRO_PRESTAZIONI = 'prestazioni'
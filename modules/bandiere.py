@@ -0,0 +1,123 @@
+# modules/bandiere.py
+
+import argparse
+import base64
+import json
+import os
+import threading
+import urllib.request
+
+from config.settings import CARTELLA_BANDIERE, MAPPA_BANDIERE
+
+# Sorgente usata solo dal passo di build per scaricare le bandiere mancanti
+URL_SORGENTE = 'https://flagcdn.com/w40/{codice}.png'
+TIPI = {'.png': 'image/png', '.svg': 'image/svg+xml'}
+
+# Segnaposto neutro per i codici senza bandiera locale
+SEGNAPOSTO = "data:image/svg+xml;base64," + base64.b64encode(
+    b"<svg xmlns='http://www.w3.org/2000/svg' width='40' height='27'>"
+    b"<rect width='40' height='27' rx='3' fill='#2A2C3E'/></svg>"
+).decode()
+
+# Mappa codice -> data URI, ricaricata solo se il file su disco cambia
+_mappa = {}
+_firma_mappa = None
+_mappa_lock = threading.Lock()
+
+
+def normalizza_codice(nazione):
+    """
+    Codice Nazione in minuscolo, limitato a lettere e trattini (usato anche come nome di classe CSS)
+    """
+    return ''.join(c for c in str(nazione).lower() if c.isalpha() or c == '-')
+
+
+def _carica_mappa():
+    global _mappa, _firma_mappa
+    try:
+        stat = os.stat(MAPPA_BANDIERE)
+    except FileNotFoundError:
+        return {}
+    firma = (stat.st_mtime_ns, stat.st_size)
+    with _mappa_lock:
+        if firma != _firma_mappa:
+            with open(MAPPA_BANDIERE, encoding='utf-8') as f:
+                _mappa = json.load(f)
+            _firma_mappa = firma
+        return _mappa
+
+
+def data_uri_bandiera(nazione):
+    """
+    Bandiera della Nazione come data URI dalla mappa locale (segnaposto se assente)
+    """
+    return _carica_mappa().get(normalizza_codice(nazione), SEGNAPOSTO)
+
+
+# --- PASSO DI BUILD ---
+
+def codici_nazione():
+    """
+    Codici Nazione presenti nelle Ranking List configurate
+    """
+    from modules.data_loader import carica_tutte
+
+    df = carica_tutte().dati
+    if df.empty or 'Nazione' not in df.columns:
+        return []
+    return sorted({normalizza_codice(nazione) for nazione in df['Nazione'].dropna().unique()})
+
+
+def scarica_bandiere(codici):
+    """
+    Scarica nella cartella locale le bandiere che ancora mancano; restituisce i codici non scaricati
+    """
+    os.makedirs(CARTELLA_BANDIERE, exist_ok=True)
+    falliti = []
+    for codice in codici:
+        if any(os.path.isfile(os.path.join(CARTELLA_BANDIERE, codice + estensione)) for estensione in TIPI):
+            continue
+        try:
+            with urllib.request.urlopen(URL_SORGENTE.format(codice=codice), timeout=10) as risposta:
+                contenuto = risposta.read()
+        except OSError:
+            falliti.append(codice)
+            continue
+        with open(os.path.join(CARTELLA_BANDIERE, codice + '.png'), 'wb') as f:
+            f.write(contenuto)
+    return falliti
+
+
+def genera_mappa():
+    """
+    Genera la mappa codice -> data URI da tutte le immagini della cartella locale
+    """
+    mappa = {}
+    for nome_file in sorted(os.listdir(CARTELLA_BANDIERE)):
+        codice, estensione = os.path.splitext(nome_file)
+        if estensione not in TIPI:
+            continue
+        with open(os.path.join(CARTELLA_BANDIERE, nome_file), 'rb') as f:
+            contenuto = base64.b64encode(f.read()).decode()
+        mappa.setdefault(normalizza_codice(codice), f"data:{TIPI[estensione]};base64,{contenuto}")
+
+    temporaneo = f"{MAPPA_BANDIERE}.tmp"
+    with open(temporaneo, 'w', encoding='utf-8') as f:
+        json.dump(mappa, f, indent=0, sort_keys=True)
+    os.replace(temporaneo, MAPPA_BANDIERE)
+    return mappa
+
+
+if __name__ == '__main__':
+    # Uso al deploy: python -m modules.bandiere [--offline]
+    parser = argparse.ArgumentParser(description="Prepara le bandiere locali per le Nazioni presenti nei dati")
+    parser.add_argument('--offline', action='store_true', help="non scaricare, usa solo le immagini già presenti")
+    args = parser.parse_args()
+
+    codici = codici_nazione()
+    if not args.offline:
+        for codice in scarica_bandiere(codici):
+            print(f"⚠️ Bandiera '{codice}' non scaricata: verrà mostrato il segnaposto.")
+    mappa = genera_mappa()
+    mancanti = [codice for codice in codici if codice not in mappa]
+    print(f"✅ {len(mappa)} bandiere in {MAPPA_BANDIERE}" + (f" (mancano: {', '.join(mancanti)})" if mancanti else ""))
@@ -1,16 +1,535 @@
 # modules/business_logic.py
 
-def applica_filtri(df, sesso='All', categoria='All', ricerca_nome=''):
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from config.settings import RICERCA_TOLLERANTE
+from modules.cache_risultati import risultati
+from modules.data_loader import COLONNA_LISTA
+from modules.metriche import conta_cache, fase
+from modules.ricerca import IndiceRicerca, normalizza
+
+# Valori dei selettori che indicano "nessun filtro"
+TUTTI = ('All', 'Tutti', 'Tutte', None, '')
+SESSI = {'Maschi': 'M', 'Femmine': 'F', 'M': 'M', 'F': 'F'}
+
+# --- STRUTTURE PRECALCOLATE PER DATASET ---
+# Chiave: id(df) -> (riferimento debole al DataFrame, {nome struttura: oggetto})
+# Le strutture vivono quanto il DataFrame condiviso restituito da data_loader.
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def per_dataset(df, nome, costruttore):
     """
-    Applica i filtri di Sesso, Categoria e Nome Atleta
+    Restituisce la struttura `nome` costruita una sola volta per il DataFrame `df`
+    """
+    with _memo_lock:
+        voce = _memo.get(id(df))
+        if voce is not None and voce[0]() is df and nome in voce[1]:
+            conta_cache(nome, True)
+            return voce[1][nome]
+
+    conta_cache(nome, False)
+    with fase(f"costruzione_{nome}", righe=len(df)):
+        oggetto = costruttore(df)
+    with _memo_lock:
+        voce = _memo.get(id(df))
+        if voce is None or voce[0]() is not df:
+            voce = (weakref.ref(df), {})
+            _memo[id(df)] = voce
+            weakref.finalize(df, _memo.pop, id(df), None)
+        voce[1].setdefault(nome, oggetto)
+        return voce[1][nome]
+
+
+class _Dimensione:
+    """
+    Codici per riga e liste di posizioni per ogni valore di una colonna
+    """
+
+    def __init__(self, serie):
+        codici, valori = pd.factorize(serie, sort=False)
+        self.valori = list(valori)
+        self.codice_di = {valore: codice for codice, valore in enumerate(self.valori)}
+        self.codici = codici
+        # Posizioni (già ordinate) delle righe per ciascun codice
+        ordine = np.argsort(codici, kind='stable')
+        confini = np.searchsorted(codici[ordine], np.arange(len(self.valori) + 1))
+        self.posizioni = [ordine[confini[i]:confini[i + 1]] for i in range(len(self.valori))]
+        # Ordine alfabetico/numerico dei valori, per le opzioni dei selettori
+        self.rango = np.empty(len(self.valori), dtype=np.int64)
+        self.rango[np.argsort(np.array(self.valori, dtype=object), kind='stable')] = np.arange(len(self.valori))
+
+    def ordinati(self, codici):
+        codici = codici[codici >= 0]
+        return [self.valori[c] for c in codici[np.argsort(self.rango[codici])]]
+
+
+class IndiceFiltri:
+    """
+    Indice dei filtri Sesso/Categoria/Società costruito una volta per dataset:
+    ogni combinazione di filtri si risolve partendo dalla lista di posizioni più corta
+    e controllando i codici delle altre colonne solo su quelle righe.
+    """
+
+    COLONNE = ('Sesso', 'Categoria', 'Società')
+
+    def __init__(self, df):
+        self.totale = len(df)
+        self.dimensioni = {
+            colonna: _Dimensione(df[colonna]) for colonna in self.COLONNE if colonna in df.columns
+        }
+        # Opzioni di Categoria già ordinate, per ogni sesso e complessive
+        categoria = self.dimensioni.get('Categoria')
+        sesso = self.dimensioni.get('Sesso')
+        self.categorie = {}
+        if categoria is not None:
+            self.categorie[None] = categoria.ordinati(np.arange(len(categoria.valori)))
+            if sesso is not None:
+                for codice, valore in enumerate(sesso.valori):
+                    presenti = np.unique(categoria.codici[sesso.posizioni[codice]])
+                    self.categorie[valore] = categoria.ordinati(presenti)
+        societa = self.dimensioni.get('Società')
+        self.societa = societa.ordinati(np.arange(len(societa.valori))) if societa is not None else []
+
+    def posizioni(self, **filtri):
+        """
+        Posizioni (ordinate) delle righe che rispettano i filtri, es. posizioni(Sesso='M', Categoria=-60).
+        Restituisce None se non c'è alcun filtro attivo (tutte le righe).
+        """
+        vincoli = []
+        for colonna, valore in filtri.items():
+            if valore in TUTTI:
+                continue
+            dimensione = self.dimensioni[colonna]
+            codice = dimensione.codice_di.get(valore)
+            if codice is None:
+                return np.empty(0, dtype=np.int64)
+            vincoli.append((dimensione, codice))
+        if not vincoli:
+            return None
+
+        vincoli.sort(key=lambda vincolo: len(vincolo[0].posizioni[vincolo[1]]))
+        dimensione, codice = vincoli[0]
+        risultato = dimensione.posizioni[codice]
+        for dimensione, codice in vincoli[1:]:
+            risultato = risultato[dimensione.codici[risultato] == codice]
+        return risultato
+
+    def opzioni_categoria(self, sesso=None):
+        """
+        Categorie disponibili (ordinate) per il sesso indicato
+        """
+        return self.categorie.get(SESSI.get(sesso), [])
+
+    def opzioni_societa(self, posizioni=None):
+        """
+        Società presenti (ordinate) tra le righe indicate
+        """
+        if posizioni is None:
+            return self.societa
+        dimensione = self.dimensioni['Società']
+        return dimensione.ordinati(np.unique(dimensione.codici[posizioni]))
+
+
+def indice_filtri(df):
+    """
+    Restituisce l'indice dei filtri del DataFrame, costruendolo solo al primo utilizzo
+    """
+    return per_dataset(df, 'indice_filtri', IndiceFiltri)
+
+
+def indice_ricerca(df, colonna):
+    """
+    Restituisce l'indice di ricerca testuale della colonna (es. Nome, Società), costruito una sola volta
+    """
+    return per_dataset(df, f"ricerca_{colonna}", lambda dati: IndiceRicerca(dati[colonna]))
+
+
+def posizioni_filtrate(df, sesso='All', categoria='All', ricerca_nome='', societa='All',
+                       tolleranza=RICERCA_TOLLERANTE):
+    """
+    Posizioni delle righe che rispettano i filtri (None = tutte le righe)
+    """
+    indice = indice_filtri(df)
+    with fase('filtri') as misura:
+        filtri = {'Sesso': SESSI.get(sesso, sesso), 'Categoria': categoria}
+        if 'Società' in indice.dimensioni:
+            filtri['Società'] = societa
+        posizioni = indice.posizioni(**filtri)
+        righe = indice_ricerca(df, 'Nome').righe(ricerca_nome, tolleranza) if ricerca_nome else None
+        if righe is not None:
+            posizioni = righe if posizioni is None else np.intersect1d(posizioni, righe, assume_unique=True)
+        misura.righe = len(df) if posizioni is None else len(posizioni)
+    return posizioni
+
+
+def applica_filtri(df, sesso='All', categoria='All', ricerca_nome='', societa='All',
+                   tolleranza=RICERCA_TOLLERANTE):
+    """
+    Applica i filtri di Sesso, Categoria, Nome Atleta e Società
+    """
+    posizioni = posizioni_filtrate(df, sesso, categoria, ricerca_nome, societa, tolleranza)
+    return df if posizioni is None else df.take(posizioni)
+
+
+# --- RISULTATI CONDIVISI TRA LE SESSIONI ---
+
+def chiave_vista(versione, lista=None, sesso=None, categoria=None, societa=None, ricerca_nome=''):
+    """
+    Chiave di una vista nella cache dei risultati, con i valori "nessun filtro" e la ricerca normalizzati:
+    la stessa vista chiesta da sessioni o API diverse ha sempre la stessa chiave
+    """
+    def valore(filtro):
+        return None if filtro in TUTTI else filtro
+
+    return (versione, valore(lista), valore(SESSI.get(sesso, sesso)), valore(categoria), valore(societa),
+            normalizza(ricerca_nome or ''))
+
+
+def posizioni_in_cache(chiave, df, sesso='All', categoria='All', ricerca_nome='', societa='All'):
+    """
+    Come posizioni_filtrate, ma calcolate una sola volta per tutte le sessioni (chiave da chiave_vista)
+    """
+    return risultati.ottieni(
+        chiave + ('filtri',), lambda: posizioni_filtrate(df, sesso, categoria, ricerca_nome, societa)
+    )
+
+
+def ordinate_in_cache(chiave, nome_ordine, ordinamento, posizioni):
+    """
+    Posizioni della vista già ordinate, condivise tra le sessioni: ogni pagina è una fetta
+    """
+    return risultati.ottieni(chiave + (nome_ordine,), lambda: ordinamento.fetta(posizioni))
+
+
+# --- INTERROGAZIONI PER POSIZIONE IN CLASSIFICA ---
+
+class Ordinamento:
     """
-    if sesso != 'All':
-        df = df[df['Sesso'] == ('M' if sesso == 'Maschi' else 'F')]
-    if categoria != 'All':
-        df = df[df['Categoria'] == categoria]
-    if ricerca_nome:
-        df = df[df['Nome'].str.contains(ricerca_nome, case=False, na=False)]
-    return df
+    Ordine delle righe di un dataset calcolato una volta (`ordine`) con il suo inverso (`rango`).
+    Le interrogazioni su un sottoinsieme di righe (i filtri attivi) selezionano solo la fetta
+    richiesta con argpartition: il costo dipende dalla pagina, non da un ordinamento completo.
+    """
+
+    def __init__(self, ordine):
+        self.ordine = np.asarray(ordine, dtype=np.int64)
+        self.rango = np.empty_like(self.ordine)
+        self.rango[self.ordine] = np.arange(len(self.ordine))
+
+    def totale(self, posizioni=None):
+        return len(self.ordine) if posizioni is None else len(posizioni)
+
+    def fetta(self, posizioni=None, inizio=0, fine=None):
+        """
+        Posizioni delle righe da `inizio` a `fine` (escluso) nell'ordine, tra quelle indicate (None = tutte)
+        """
+        if posizioni is None:
+            return self.ordine[inizio:fine]
+        posizioni = np.asarray(posizioni)
+        ranghi = self.rango[posizioni]
+        fine = len(ranghi) if fine is None else min(fine, len(ranghi))
+        inizio = max(0, inizio)
+        if inizio >= fine:
+            return np.empty(0, dtype=np.int64)
+        if inizio > 0 or fine < len(ranghi):
+            # Dopo la partizione gli elementi tra i due confini sono esattamente quelli della fetta
+            scelti = np.argpartition(ranghi, sorted({inizio, fine - 1}))[inizio:fine]
+        else:
+            scelti = np.arange(len(ranghi))
+        return posizioni[scelti[np.argsort(ranghi[scelti], kind='stable')]]
+
+    def primi(self, n, posizioni=None):
+        """
+        Top-N: le prime `n` righe nell'ordine
+        """
+        return self.fetta(posizioni, 0, n)
+
+    def pagina(self, posizioni=None, pagina_corrente=1, risultati_per_pagina=10):
+        """
+        Restituisce (posizioni della pagina, pagina corrente, totale pagine)
+        """
+        totale = self.totale(posizioni)
+        totale_pagine = (totale - 1) // risultati_per_pagina + 1 if totale else 1
+        pagina_corrente = max(1, min(pagina_corrente, totale_pagine))
+        inizio = (pagina_corrente - 1) * risultati_per_pagina
+        return self.fetta(posizioni, inizio, inizio + risultati_per_pagina), pagina_corrente, totale_pagine
+
+    def indice_di(self, riga, posizioni=None):
+        """
+        Indice (da 0) della riga nell'ordine ristretto alle posizioni indicate; None se non è tra queste
+        """
+        if posizioni is None:
+            return int(self.rango[riga])
+        ranghi = self.rango[np.asarray(posizioni)]
+        if not np.any(ranghi == self.rango[riga]):
+            return None
+        return int(np.count_nonzero(ranghi < self.rango[riga]))
+
+    def intorno(self, riga, raggio=5, posizioni=None):
+        """
+        Finestra di ±`raggio` righe attorno alla riga indicata: (posizioni, indice della prima) oppure None
+        """
+        indice = self.indice_di(riga, posizioni)
+        if indice is None:
+            return None
+        inizio = max(0, indice - raggio)
+        return self.fetta(posizioni, inizio, indice + raggio + 1), inizio
+
+
+def ordine_per_colonna(df, colonna='Ranking', decrescente=False):
+    """
+    Ordinamento stabile del dataset per la colonna (a parità resta l'ordine del file), calcolato una volta
+    """
+    def costruisci(dati):
+        valori = dati[colonna].to_numpy()
+        return Ordinamento(np.argsort(-valori.astype(np.int64) if decrescente else valori, kind='stable'))
+
+    return per_dataset(df, f"ordine_{colonna}_{decrescente}", costruisci)
+
+
+def ordine_del_file(df):
+    """
+    Ordinamento che lascia le righe nell'ordine del file
+    """
+    return per_dataset(df, 'ordine_file', lambda dati: Ordinamento(np.arange(len(dati))))
+
+
+# --- CLASSIFICA SOCIETÀ ---
+
+class ClassificaSocieta:
+    """
+    Aggregati per Società (Punti Totali, Numero Atleti, Media Punti) calcolati una volta per dataset,
+    sia complessivi sia per singola Ranking List, con gli ordinamenti già pronti:
+    ogni pagina della classifica è una semplice fetta.
+    """
+
+    ORDINAMENTI = ('Punti Totali', 'Media Punti', 'Numero Atleti')
+    CHIAVI = ['Nazione', 'Società']
+
+    def __init__(self, df, colonna_lista=COLONNA_LISTA):
+        if colonna_lista in df.columns:
+            # Un solo groupby per lista; il totale è la somma degli aggregati per lista
+            per_lista = self._aggrega(df, [colonna_lista] + self.CHIAVI)
+            totale = per_lista.groupby(self.CHIAVI, observed=True, sort=False)[
+                ['Punti Totali', 'Numero Atleti']
+            ].sum().reset_index()
+            self.tabelle = {None: self._prepara(totale)}
+            for lista, gruppo in per_lista.groupby(colonna_lista, observed=True, sort=False):
+                self.tabelle[lista] = self._prepara(gruppo.drop(columns=colonna_lista))
+        else:
+            self.tabelle = {None: self._prepara(self._aggrega(df, self.CHIAVI))}
+
+    @staticmethod
+    def _aggrega(df, chiavi):
+        return (
+            df.groupby(chiavi, observed=True, sort=False)
+            .agg({'Punti': 'sum', 'Nome': 'count'})
+            .reset_index()
+            .rename(columns={'Nome': 'Numero Atleti', 'Punti': 'Punti Totali'})
+        )
+
+    def _prepara(self, tabella):
+        tabella = tabella.reset_index(drop=True)
+        tabella['Media Punti'] = (tabella['Punti Totali'] / tabella['Numero Atleti']).round(2)
+        ordini = {
+            chiave: np.argsort(-tabella[chiave].to_numpy(), kind='stable') for chiave in self.ORDINAMENTI
+        }
+        return tabella, ordini
+
+    def liste(self):
+        """
+        Ranking List con aggregati disponibili
+        """
+        return [lista for lista in self.tabelle if lista is not None]
+
+    def _tabella(self, lista):
+        return self.tabelle.get(None if lista in TUTTI else lista)
+
+    def ordine(self, lista=None, ordinamento='Punti Totali', societa=None):
+        """
+        Posizioni delle righe della tabella nell'ordine richiesto, eventualmente limitate alle Società indicate
+        """
+        voce = self._tabella(lista)
+        if voce is None:
+            return np.empty(0, dtype=np.int64)
+        tabella, ordini = voce
+        ordine = ordini[ordinamento]
+        if societa is not None:
+            ordine = ordine[tabella['Società'].isin(societa).to_numpy()[ordine]]
+        return ordine
+
+    def classifica(self, lista=None, ordinamento='Punti Totali', societa=None, inizio=0, fine=None, ordine=None):
+        """
+        Classifica Società ordinata (o una sua fetta), con la colonna Ranking.
+        `ordine` evita di ricalcolare le posizioni se già note (es. dalla cache dei risultati).
+        """
+        voce = self._tabella(lista)
+        if voce is None:
+            return pd.DataFrame(columns=self.CHIAVI + list(self.ORDINAMENTI) + ['Ranking'])
+        if ordine is None:
+            ordine = self.ordine(lista, ordinamento, societa)
+        ordine = ordine[inizio:fine]
+        fetta = voce[0].take(ordine).reset_index(drop=True)
+        fetta['Ranking'] = np.arange(inizio + 1, inizio + len(fetta) + 1)
+        return fetta
+
+    def pagina(self, lista=None, ordinamento='Punti Totali', societa=None, pagina_corrente=1,
+               risultati_per_pagina=10, ordine=None):
+        """
+        Restituisce (pagina della classifica, pagina corrente, totale pagine)
+        """
+        if ordine is None:
+            ordine = self.ordine(lista, ordinamento, societa)
+        totale = len(ordine)
+        totale_pagine = (totale - 1) // risultati_per_pagina + 1 if totale else 1
+        pagina_corrente = max(1, min(pagina_corrente, totale_pagine))
+        inizio = (pagina_corrente - 1) * risultati_per_pagina
+        fetta = self.classifica(lista, ordinamento, societa, inizio, inizio + risultati_per_pagina, ordine)
+        return fetta, pagina_corrente, totale_pagine
+
+
+def classifica_societa_dataset(df):
+    """
+    Restituisce gli aggregati per Società del dataset, calcolati una sola volta
+    """
+    return per_dataset(df, 'classifica_societa', ClassificaSocieta)
+
+
+# --- CUBO DELLE STATISTICHE ---
+
+class CuboStatistiche:
+    """
+    Misure sui Punti (somma, conteggio, media, massimo e numero di atleti) per ogni combinazione di
+    Ranking List, Sesso, Categoria, Società e Nazione, calcolate una volta per dataset.
+    Ogni sezione (filtri) e aggregazione (roll-up) lavora solo sulle celle del cubo, mai sulle righe
+    degli atleti. Come nella Classifica Società, un atleta presente in più liste conta una volta per lista.
+    """
+
+    DIMENSIONI = (COLONNA_LISTA, 'Sesso', 'Categoria', 'Società', 'Nazione')
+    MISURE = ('Punti Totali', 'Conteggio Punti', 'Media Punti', 'Punti Massimi', 'Numero Atleti')
+
+    def __init__(self, df):
+        self.dimensioni = [dimensione for dimensione in self.DIMENSIONI if dimensione in df.columns]
+        # Valori di ogni dimensione; nelle celle il codice 0 indica il valore mancante
+        self.valori = {}
+        codici = []
+        for dimensione in self.dimensioni:
+            codici_riga, valori = pd.factorize(df[dimensione])
+            # Valori in ordine alfabetico/numerico (non nell'ordine delle categorie), come nei selettori
+            ordine = np.argsort(np.array(valori, dtype=object), kind='stable')
+            rango = np.empty(len(valori) + 1, dtype=np.int64)
+            rango[ordine + 1] = np.arange(1, len(valori) + 1)
+            rango[0] = 0
+            valori = valori.tolist()
+            self.valori[dimensione] = [valori[i] for i in ordine]
+            codici.append(rango[codici_riga + 1])
+        self._taglie = tuple(len(self.valori[d]) + 1 for d in self.dimensioni)
+
+        if not len(df):
+            cella = np.empty(0, dtype=np.int64)
+        elif codici:
+            cella = np.ravel_multi_index(codici, self._taglie)
+        else:
+            cella = np.zeros(len(df), dtype=np.int64)
+        celle, cella_riga = np.unique(cella, return_inverse=True)
+        self.codici = dict(zip(self.dimensioni, np.unravel_index(celle, self._taglie)))
+
+        punti = pd.to_numeric(df['Punti'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        con_punti = ~np.isnan(punti)
+        self.somme = np.bincount(cella_riga[con_punti], weights=punti[con_punti], minlength=len(celle))
+        self.conteggi = np.bincount(cella_riga[con_punti], minlength=len(celle))
+        self.massimi = np.full(len(celle), -np.inf)
+        np.maximum.at(self.massimi, cella_riga[con_punti], punti[con_punti])
+        self.atleti = np.bincount(cella_riga, minlength=len(celle))
+
+    def _maschera(self, filtri):
+        """
+        Celle che rispettano i filtri {dimensione: valore o lista di valori}; i valori "nessun filtro" sono ignorati
+        """
+        maschera = np.ones(len(self.atleti), dtype=bool)
+        for dimensione, scelti in (filtri or {}).items():
+            if scelti in TUTTI or (isinstance(scelti, (list, tuple, set)) and not scelti):
+                continue
+            if dimensione not in self.codici:
+                raise KeyError(f"Dimensione '{dimensione}' non presente nel cubo")
+            if not isinstance(scelti, (list, tuple, set)):
+                scelti = [scelti]
+            if dimensione == 'Sesso':
+                scelti = [SESSI.get(valore, valore) for valore in scelti]
+            posizione = {valore: codice + 1 for codice, valore in enumerate(self.valori[dimensione])}
+            ammessi = [posizione[valore] for valore in scelti if valore in posizione]
+            maschera &= np.isin(self.codici[dimensione], ammessi)
+        return maschera
+
+    def valori_presenti(self, dimensione, filtri=None):
+        """
+        Valori (ordinati) di una dimensione presenti nella sezione indicata, per le opzioni dei selettori
+        """
+        codici = np.unique(self.codici[dimensione][self._maschera(filtri)])
+        return [self.valori[dimensione][codice - 1] for codice in codici if codice > 0]
+
+    def interroga(self, per=(), filtri=None, ordina=None, limite=None):
+        """
+        Aggrega le celle della sezione `filtri` per le dimensioni `per` (nessuna = totale della sezione).
+        Restituisce un DataFrame con le dimensioni e le misure, ordinato per la misura `ordina`
+        (decrescente) e limitato alle prime `limite` righe.
+        """
+        per = list(per)
+        for dimensione in per:
+            if dimensione not in self.codici:
+                raise KeyError(f"Dimensione '{dimensione}' non presente nel cubo")
+        maschera = self._maschera(filtri)
+
+        if per:
+            chiave = np.ravel_multi_index([self.codici[d][maschera] for d in per],
+                                          [self._taglie[self.dimensioni.index(d)] for d in per])
+        else:
+            chiave = np.zeros(int(maschera.sum()), dtype=np.int64)
+        gruppi, gruppo = np.unique(chiave, return_inverse=True)
+        # Senza dimensioni il totale è sempre una riga, anche per una sezione vuota
+        numero = len(gruppi) if per else 1
+
+        somme = np.bincount(gruppo, weights=self.somme[maschera], minlength=numero)
+        conteggi = np.bincount(gruppo, weights=self.conteggi[maschera], minlength=numero).astype(np.int64)
+        massimi = np.full(numero, -np.inf)
+        np.maximum.at(massimi, gruppo, self.massimi[maschera])
+        atleti = np.bincount(gruppo, weights=self.atleti[maschera], minlength=numero).astype(np.int64)
+
+        tabella = {}
+        if per:
+            codici = np.unravel_index(gruppi, [self._taglie[self.dimensioni.index(d)] for d in per])
+            for dimensione, codici_dimensione in zip(per, codici):
+                valori = np.array([None] + self.valori[dimensione], dtype=object)
+                tabella[dimensione] = valori[codici_dimensione]
+        medie = np.where(conteggi > 0, somme / np.maximum(conteggi, 1), np.nan)
+        tabella.update({
+            'Punti Totali': somme.round().astype(np.int64),
+            'Conteggio Punti': conteggi,
+            'Media Punti': medie.round(2),
+            'Punti Massimi': pd.array(np.where(np.isinf(massimi), np.nan, massimi)).astype('Int64'),
+            'Numero Atleti': atleti,
+        })
+        risultato = pd.DataFrame(tabella)
+
+        if ordina is not None:
+            ordine = np.argsort(-risultato[ordina].to_numpy(dtype=float, na_value=-np.inf), kind='stable')
+            risultato = risultato.take(ordine[:limite]).reset_index(drop=True)
+        elif limite is not None:
+            risultato = risultato.iloc[:limite]
+        return risultato
+
+
+def cubo_statistiche(df):
+    """
+    Restituisce il cubo delle statistiche del dataset, costruito una sola volta
+    """
+    return per_dataset(df, 'cubo_statistiche', CuboStatistiche)
+
 
 def paginazione(df, pagina_corrente, risultati_per_pagina):
     """
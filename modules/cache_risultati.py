@@ -0,0 +1,129 @@
+# modules/cache_risultati.py
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from config.settings import RISULTATI_CACHE_MAX_BYTES, RISULTATI_CACHE_MAX_VOCI
+from modules.data_loader import registra_invalidazione
+from modules.metriche import conta_cache
+
+_ASSENTE = object()
+
+
+class CacheRisultati:
+    """
+    Cache LRU condivisa da tutte le sessioni con i risultati delle viste: solo array di posizioni
+    delle righe (mai DataFrame), limitata per numero di voci e byte totali.
+    La chiave contiene la versione del dataset, quindi una voce non diventa mai obsoleta:
+    al più smette di essere richiesta e viene espulsa.
+    """
+
+    def __init__(self, max_voci=RISULTATI_CACHE_MAX_VOCI, max_byte=RISULTATI_CACHE_MAX_BYTES):
+        self.max_voci = max_voci
+        self.max_byte = max_byte
+        self._voci = OrderedDict()
+        self._byte = 0
+        self._lock = threading.Lock()
+        # Una sola elaborazione per chiave anche con più sessioni in parallelo
+        self._in_corso = {}
+        self.hit = 0
+        self.miss = 0
+        self.espulsioni = 0
+
+    @staticmethod
+    def _dimensione(valore):
+        return valore.nbytes if isinstance(valore, np.ndarray) else 0
+
+    def _registra(self, chiave, valore):
+        # Da chiamare con il lock acquisito
+        if chiave in self._voci:
+            return
+        dimensione = self._dimensione(valore)
+        if dimensione > self.max_byte:
+            return
+        self._voci[chiave] = valore
+        self._byte += dimensione
+        while len(self._voci) > self.max_voci or self._byte > self.max_byte:
+            _, espulso = self._voci.popitem(last=False)
+            self._byte -= self._dimensione(espulso)
+            self.espulsioni += 1
+
+    def ottieni(self, chiave, calcola):
+        """
+        Restituisce il valore della chiave, calcolandolo con `calcola()` solo se non è in cache.
+        Gli array salvati sono in sola lettura: sono condivisi tra le sessioni.
+        """
+        with self._lock:
+            valore = self._voci.get(chiave, _ASSENTE)
+            if valore is not _ASSENTE:
+                self._voci.move_to_end(chiave)
+                self.hit += 1
+            else:
+                self.miss += 1
+                lock = self._in_corso.setdefault(chiave, threading.Lock())
+        conta_cache('risultati', valore is not _ASSENTE)
+        if valore is not _ASSENTE:
+            return valore
+
+        try:
+            with lock:
+                with self._lock:
+                    valore = self._voci.get(chiave, _ASSENTE)
+                if valore is _ASSENTE:
+                    valore = calcola()
+                    if isinstance(valore, np.ndarray):
+                        valore.setflags(write=False)
+                    with self._lock:
+                        self._registra(chiave, valore)
+        finally:
+            # Anche se calcola() fallisce: la chiave non deve restare in corso per sempre
+            with self._lock:
+                self._in_corso.pop(chiave, None)
+        return valore
+
+    def contiene(self, chiave):
+        with self._lock:
+            return chiave in self._voci
+
+    def svuota(self):
+        with self._lock:
+            self._voci.clear()
+            self._byte = 0
+
+    def statistiche(self):
+        """
+        Voci, byte occupati, hit, miss, hit rate ed espulsioni
+        """
+        with self._lock:
+            richieste = self.hit + self.miss
+            return {
+                'voci': len(self._voci), 'byte': self._byte, 'hit': self.hit, 'miss': self.miss,
+                'hit_rate': self.hit / richieste if richieste else 0.0, 'espulsioni': self.espulsioni,
+            }
+
+    def testo_prometheus(self):
+        """
+        Statistiche della cache nel formato testuale di Prometheus
+        """
+        statistiche = self.statistiche()
+        return '\n'.join([
+            '# HELP ranking_risultati_richieste_total Richieste alla cache dei risultati per esito.',
+            '# TYPE ranking_risultati_richieste_total counter',
+            f'ranking_risultati_richieste_total{{esito="hit"}} {statistiche["hit"]}',
+            f'ranking_risultati_richieste_total{{esito="miss"}} {statistiche["miss"]}',
+            '# HELP ranking_risultati_espulsioni_total Voci espulse dalla cache dei risultati.',
+            '# TYPE ranking_risultati_espulsioni_total counter',
+            f'ranking_risultati_espulsioni_total {statistiche["espulsioni"]}',
+            '# HELP ranking_risultati_byte Memoria occupata dalla cache dei risultati.',
+            '# TYPE ranking_risultati_byte gauge',
+            f'ranking_risultati_byte {statistiche["byte"]}',
+        ]) + '\n'
+
+
+# Cache di processo condivisa da dashboard, API e prefetch
+risultati = CacheRisultati()
+
+# I risultati di una versione superata non verranno più richiesti: si libera la memoria
+registra_invalidazione(lambda ranking: risultati.svuota())
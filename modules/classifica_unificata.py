@@ -0,0 +1,233 @@
+# modules/classifica_unificata.py
+
+import heapq
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from modules.business_logic import Ordinamento, per_dataset
+from modules.cache_risultati import risultati
+from modules.data_loader import COLONNA_LISTA
+from modules.metriche import fase
+
+# Viste combinate di più Ranking List (una riga per atleta)
+MIGLIOR_POSIZIONE = 'Miglior posizione'
+PUNTI_SOMMATI = 'Punti sommati'
+VISTE = (MIGLIOR_POSIZIONE, PUNTI_SOMMATI)
+
+
+class ClassificaUnificata:
+    """
+    Classifica di più Ranking List unite (il DataFrame di carica_tutte) con l'identità degli atleti
+    risolta tra le liste: Nome + Data di Nascita, oppure Nome + Società se la data manca.
+
+    Ogni lista è ordinata una volta sola per (Ranking, -Punti); l'ordine complessivo si ottiene
+    fondendo le liste già ordinate (k-way merge), che si ferma appena la pagina richiesta è completa.
+    """
+
+    def __init__(self, df):
+        self.totale = len(df)
+        self.ranking = df['Ranking'].to_numpy(dtype=np.int64)
+        self.punti = df['Punti'].to_numpy(dtype=np.int64)
+
+        nomi = df['Nome'].astype(str)
+        if 'Data Nascita' in df.columns:
+            seconda = df['Data Nascita'].astype(str).where(df['Data Nascita'].notna(), None)
+        else:
+            seconda = pd.Series([None] * len(df), index=df.index)
+        if 'Società' in df.columns:
+            seconda = seconda.fillna('societa:' + df['Società'].astype(str))
+        self.id_atleta, _ = pd.factorize(pd.MultiIndex.from_arrays([nomi, seconda.fillna('')]))
+        self.numero_atleti = int(self.id_atleta.max()) + 1 if len(df) else 0
+
+        # Righe di ogni atleta, per il dettaglio per lista
+        ordine = np.argsort(self.id_atleta, kind='stable')
+        self._righe_per_atleta = ordine
+        self._confini = np.searchsorted(self.id_atleta[ordine], np.arange(self.numero_atleti + 1))
+
+        # Ordine (Ranking, -Punti) di ogni lista, calcolato una sola volta
+        liste = df[COLONNA_LISTA]
+        self.liste = [str(lista) for lista in liste.cat.categories if (liste == lista).any()]
+        self.lista = liste.astype(str).to_numpy()
+        self.ordini_lista = {}
+        for lista in self.liste:
+            righe = np.flatnonzero(self.lista == lista)
+            self.ordini_lista[lista] = righe[np.lexsort((-self.punti[righe], self.ranking[righe]))]
+
+    def _maschera(self, posizioni):
+        if posizioni is None:
+            return None
+        maschera = np.zeros(self.totale, dtype=bool)
+        maschera[posizioni] = True
+        return maschera
+
+    def _fusione(self, posizioni=None):
+        """
+        Posizioni delle righe in ordine (Ranking, -Punti), fondendo le liste già ordinate
+        """
+        maschera = self._maschera(posizioni)
+        flussi = []
+        for ordine in self.ordini_lista.values():
+            if maschera is not None:
+                ordine = ordine[maschera[ordine]]
+            flussi.append(zip(self.ranking[ordine].tolist(), (-self.punti[ordine]).tolist(), ordine.tolist()))
+        return (posizione for _, _, posizione in heapq.merge(*flussi))
+
+    def righe(self, posizioni=None, inizio=0, fine=None):
+        """
+        Righe (tutte le liste, senza accorpare gli atleti) da `inizio` a `fine` nell'ordine complessivo
+        """
+        with fase('unificata_righe', righe=(fine or self.totale) - inizio):
+            return np.fromiter(islice(self._fusione(posizioni), inizio, fine), dtype=np.int64)
+
+    def totale_atleti(self, posizioni=None):
+        """
+        Numero di atleti distinti tra le righe indicate
+        """
+        if posizioni is None:
+            return self.numero_atleti
+        return int(np.count_nonzero(np.bincount(self.id_atleta[posizioni], minlength=self.numero_atleti)))
+
+    def _migliori(self, posizioni, fine):
+        """
+        Riga migliore di ogni atleta, nell'ordine della miglior posizione: la prima occorrenza
+        di un atleta nella fusione è la sua posizione migliore
+        """
+        visti = np.zeros(self.numero_atleti, dtype=bool)
+        migliori = []
+        for posizione in self._fusione(posizioni):
+            atleta = self.id_atleta[posizione]
+            if not visti[atleta]:
+                visti[atleta] = True
+                migliori.append(posizione)
+                if fine is not None and len(migliori) >= fine:
+                    break
+        return np.array(migliori, dtype=np.int64)
+
+    def _somme(self, posizioni):
+        """
+        Punti sommati per atleta e riga migliore (Ranking più basso, poi più Punti) di ciascuno
+        """
+        righe = np.arange(self.totale) if posizioni is None else np.asarray(posizioni)
+        atleti = self.id_atleta[righe]
+        somme = np.bincount(atleti, weights=self.punti[righe], minlength=self.numero_atleti).astype(np.int64)
+        # Chiave unica (più piccola = migliore) e suo minimo per atleta, in tempo lineare
+        massimo = int(self.punti.max()) + 1 if self.totale else 1
+        chiave = self.ranking[righe] * massimo + (massimo - 1 - self.punti[righe])
+        minimo = np.full(self.numero_atleti, np.iinfo(np.int64).max)
+        np.minimum.at(minimo, atleti, chiave)
+        migliore = np.full(self.numero_atleti, -1, dtype=np.int64)
+        scelte = chiave == minimo[atleti]
+        migliore[atleti[scelte]] = righe[scelte]
+        return somme, migliore
+
+    def _per_somma(self, posizioni, inizio, fine):
+        """
+        Atleti ordinati per Punti sommati: con una pagina si selezionano solo i primi `fine` (argpartition)
+        """
+        somme, migliore = self._somme(posizioni)
+        presenti = np.flatnonzero(migliore >= 0)
+        # Chiave unica (più Punti, poi id atleta): selezione e ordinamento rompono le parità allo stesso modo,
+        # così le pagine successive sono fette dello stesso ordine complessivo
+        chiave = -somme[presenti] * max(self.numero_atleti, 1) + presenti
+        if fine is not None and fine < len(presenti):
+            scelti = np.argpartition(chiave, fine - 1)[:fine]
+            presenti, chiave = presenti[scelti], chiave[scelti]
+        ordine = np.argsort(chiave)[inizio:fine]
+        return presenti[ordine], somme, migliore
+
+    def _dettaglio(self, atleti, maschera):
+        """
+        Per ogni atleta: elenco 'U18 #3, U21 #12' e colonne Ranking/Punti per lista
+        """
+        elenchi = []
+        colonne = {f"{campo} {lista}": [] for lista in self.liste for campo in ('Ranking', 'Punti')}
+        for atleta in atleti:
+            righe = self._righe_per_atleta[self._confini[atleta]:self._confini[atleta + 1]]
+            if maschera is not None:
+                righe = righe[maschera[righe]]
+            per_lista = {self.lista[riga]: riga for riga in righe[np.argsort(self.ranking[righe], kind='stable')][::-1]}
+            elenchi.append(', '.join(f"{lista} #{self.ranking[per_lista[lista]]}"
+                                     for lista in self.liste if lista in per_lista))
+            for lista in self.liste:
+                riga = per_lista.get(lista)
+                colonne[f"Ranking {lista}"].append(self.ranking[riga] if riga is not None else None)
+                colonne[f"Punti {lista}"].append(self.punti[riga] if riga is not None else None)
+        return elenchi, colonne
+
+    def scelta(self, vista=MIGLIOR_POSIZIONE, posizioni=None, inizio=0, fine=None):
+        """
+        Righe migliori degli atleti da `inizio` a `fine` nella vista richiesta (la parte costosa di una pagina)
+        """
+        if vista == MIGLIOR_POSIZIONE:
+            return self._migliori(posizioni, fine)[inizio:]
+        atleti, _, migliore = self._per_somma(posizioni, inizio, fine)
+        return migliore[atleti]
+
+    def somme(self, posizioni=None):
+        """
+        Punti sommati di ogni atleta tra le righe indicate
+        """
+        return self._somme(posizioni)[0]
+
+    def atleti(self, df, vista=MIGLIOR_POSIZIONE, posizioni=None, inizio=0, fine=None, migliori=None, somme=None):
+        """
+        Una riga per atleta (dati della sua riga migliore) per la vista richiesta:
+        - Miglior posizione: Ranking e Punti della lista in cui è meglio classificato
+        - Punti sommati: Ranking = posizione per Punti sommati, Punti = somma sulle liste
+        In entrambe 'Punti Totali', 'Liste' e le colonne Ranking/Punti di ogni lista.
+        `migliori` e `somme` (da scelta e somme) evitano di ricalcolarli se già noti.
+        """
+        with fase(f"unificata_{vista}") as misura:
+            if migliori is None:
+                migliori = self.scelta(vista, posizioni, inizio, fine)
+            if somme is None:
+                somme = self.somme(posizioni)
+            atleti = self.id_atleta[migliori]
+
+            risultato = df.take(migliori).reset_index(drop=True)
+            risultato['Punti Totali'] = somme[atleti]
+            if vista == PUNTI_SOMMATI:
+                risultato['Ranking'] = np.arange(inizio + 1, inizio + len(risultato) + 1)
+                risultato['Punti'] = risultato['Punti Totali']
+            elenchi, colonne = self._dettaglio(atleti, self._maschera(posizioni))
+            risultato['Liste'] = elenchi
+            for nome, valori in colonne.items():
+                risultato[nome] = pd.array(valori, dtype='Int64')
+            misura.righe = len(risultato)
+        return risultato
+
+
+def classifica_unificata(df):
+    """
+    Restituisce la classifica unificata del dataset combinato, costruita una sola volta
+    """
+    return per_dataset(df, 'classifica_unificata', ClassificaUnificata)
+
+
+def ordine_unificato(df):
+    """
+    Ordine complessivo di tutte le righe (fusione delle liste già ordinate), per pagine e ricerche di posizione
+    """
+    return per_dataset(df, 'ordine_unificato', lambda dati: Ordinamento(classifica_unificata(dati).righe()))
+
+
+def scelta_in_cache(chiave, df, vista, posizioni, inizio, fine):
+    """
+    Righe scelte della pagina e Punti sommati dalla cache dei risultati (chiave da chiave_vista)
+    """
+    unificata = classifica_unificata(df)
+    migliori = risultati.ottieni(chiave + (vista, inizio, fine),
+                                 lambda: unificata.scelta(vista, posizioni, inizio, fine))
+    somme = risultati.ottieni(chiave + ('somme',), lambda: unificata.somme(posizioni))
+    return migliori, somme
+
+
+def pagina_unificata(chiave, df, vista, posizioni, inizio, fine):
+    """
+    Pagina di una vista per atleta composta dalla cache dei risultati: le pagine già viste
+    o precaricate non rifanno la fusione delle liste
+    """
+    migliori, somme = scelta_in_cache(chiave, df, vista, posizioni, inizio, fine)
+    return classifica_unificata(df).atleti(df, vista, posizioni, inizio, fine, migliori, somme)
@@ -1,10 +1,748 @@
 # modules/data_loader.py
 
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+from config.settings import (
+    ALIAS_COLONNE, CACHE_TTL, COLONNE_CATEGORICHE, COLONNE_INTERE, COLONNE_LETTE, COLONNE_OBBLIGATORIE, EXCEL_FILES,
+    MAX_WORKER_CARICAMENTO, MEMORIA_CONDIVISA, RIGHE_PER_BLOCCO, SHEET_NAME, USA_SIDECAR
+)
+from modules.metriche import conta_cache, fase
+
+# Colonna aggiunta da carica_tutte con la Ranking List di provenienza di ogni riga
+COLONNA_LISTA = 'Ranking List'
+
+# Esito di carica_tutte: dati unificati, file non caricati e versione del dataset
+RisultatoCaricamento = namedtuple('RisultatoCaricamento', ['dati', 'mancanti', 'versione'])
+FileMancante = namedtuple('FileMancante', ['ranking', 'file_path', 'motivo'])
+
+# Chiavi dei metadati Parquet: firma del file Excel di origine e righe scartate dalla validazione
+_META_SORGENTE = b'ranking_sorgente'
+_META_SCARTI = b'ranking_scarti'
+# Da incrementare quando cambia valida_schema: i sidecar esistenti vengono rigenerati
+VERSIONE_SCHEMA = 1
+
+
+class SchemaNonValido(ValueError):
+    """
+    Il foglio non contiene le colonne necessarie alla dashboard
+    """
+
+# --- CACHE CONDIVISA DI PROCESSO ---
+# Il modulo viene importato una sola volta dal server Streamlit, quindi questo
+# dizionario è condiviso da tutte le sessioni connesse.
+# Chiave: (percorso assoluto, foglio) -> (firma file, istante di caricamento, DataFrame)
+_cache = {}
+_cache_lock = threading.Lock()
+# Un lock per file: se più sessioni chiedono lo stesso file scaduto, lo legge una sola
+_lock_caricamento = {}
+# Righe scartate dalla validazione dell'ultimo caricamento: (percorso assoluto, foglio) -> lista di dict
+_scarti = {}
+# True quando un watcher ricarica i file in background (vedi attiva_aggiornamento_in_background)
+_aggiornamento_in_background = False
+# Funzioni da chiamare quando una Ranking List cambia (vedi registra_invalidazione)
+_invalidazioni = []
+
+
+def firma_file(file_path):
+    """
+    Restituisce la firma (mtime, dimensione) del file, usata per invalidare la cache
+    """
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# --- SCHEMA ---
+
+def _tipizza(df):
+    """
+    Converte le colonne nei tipi compatti dello schema: categoriche per le colonne a bassa
+    cardinalità (Sesso, Categoria, ...), interi della dimensione minima per punti e posizioni
+    """
+    for colonna in COLONNE_CATEGORICHE:
+        if colonna in df.columns and not isinstance(df[colonna].dtype, pd.CategoricalDtype):
+            df[colonna] = df[colonna].astype('category')
+    for colonna in df.columns:
+        if colonna in COLONNE_CATEGORICHE:
+            continue
+        if colonna in COLONNE_INTERE or pd.api.types.is_integer_dtype(df[colonna].dtype):
+            df[colonna] = pd.to_numeric(df[colonna], downcast='integer')
+    return df
+
+
+def valida_schema(df):
+    """
+    Valida e tipizza il foglio: uniforma i nomi delle colonne, scarta le righe malformate
+    (Nome vuoto, Ranking/Punti non numerici, Sesso diverso da M/F) e restituisce (df, scarti),
+    dove scarti è una lista di {'riga': riga Excel, 'motivo': descrizione}
+    """
+    df = df.rename(columns=lambda colonna: str(colonna).strip()).rename(columns=ALIAS_COLONNE)
+    mancanti = [colonna for colonna in COLONNE_OBBLIGATORIE if colonna not in df.columns]
+    if mancanti:
+        raise SchemaNonValido(f"colonne mancanti: {', '.join(mancanti)}")
+
+    motivi = pd.Series('', index=df.index)
+    nomi = df['Nome'].astype('string').str.strip()
+    motivi[nomi.isna() | (nomi == '')] += 'Nome vuoto; '
+    for colonna in COLONNE_INTERE:
+        if colonna in df.columns:
+            valori = pd.to_numeric(df[colonna], errors='coerce')
+            motivi[valori.isna() | (valori % 1 != 0)] += f"{colonna} non intero; "
+            df[colonna] = valori
+    motivi[~df['Sesso'].isin(['M', 'F'])] += 'Sesso non valido; '
+
+    malformate = motivi != ''
+    # +2: intestazione e numerazione da 1 del foglio Excel
+    scarti = [
+        {'riga': int(indice) + 2, 'motivo': motivo.rstrip('; ')}
+        for indice, motivo in motivi[malformate].items()
+    ]
+    if scarti:
+        df = df[~malformate].reset_index(drop=True)
+    return _tipizza(df), scarti
+
+
+# --- LETTURA IN STREAMING DELL'EXCEL ---
+
+def _nome_colonna(colonna):
+    colonna = str(colonna).strip()
+    return ALIAS_COLONNE.get(colonna, colonna)
+
+
+def _blocco_in_colonne(righe, colonne):
+    """
+    Converte un blocco di righe (tuple di openpyxl) in colonne tipizzate: categoriche per le colonne
+    a bassa cardinalità, numeriche per punti e posizioni (NaN se non numeriche: le scarta la validazione)
+    """
+    blocco = {}
+    for indice, nome in colonne:
+        valori = [riga[indice] if indice < len(riga) else None for riga in righe]
+        if nome in COLONNE_CATEGORICHE:
+            blocco[nome] = pd.Categorical(valori)
+        elif nome in COLONNE_INTERE:
+            blocco[nome] = pd.to_numeric(pd.Series(valori, dtype=object), errors='coerce')
+        else:
+            blocco[nome] = pd.Series(valori)
+    return blocco
+
+
+def leggi_excel_a_blocchi(file_path, sheet_name=SHEET_NAME, colonne=COLONNE_LETTE, max_righe=None,
+                          righe_per_blocco=RIGHE_PER_BLOCCO):
+    """
+    Legge il foglio in streaming (openpyxl in sola lettura, senza caricare il modello del workbook)
+    e produce blocchi di al più `righe_per_blocco` righe già convertiti in colonne tipizzate.
+    `colonne` limita la lettura alle colonne indicate (se presenti), `max_righe` ferma la lettura in anticipo.
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        foglio = libro[sheet_name]
+        # Alcuni generatori di Excel scrivono dimensioni errate: si legge fin dove ci sono dati
+        foglio.reset_dimensions()
+        righe = foglio.iter_rows(values_only=True)
+        intestazione = next(righe, None) or ()
+        selezionate = [
+            (indice, _nome_colonna(colonna)) for indice, colonna in enumerate(intestazione)
+            if colonna is not None and (colonne is None or _nome_colonna(colonna) in colonne)
+        ]
+
+        blocco = []
+        lette = 0
+        for riga in righe:
+            if max_righe is not None and lette >= max_righe:
+                break
+            # Come pd.read_excel, le righe completamente vuote non contano
+            if all(valore is None for valore in riga):
+                continue
+            blocco.append(riga)
+            lette += 1
+            if len(blocco) == righe_per_blocco:
+                yield _blocco_in_colonne(blocco, selezionate)
+                blocco = []
+        if blocco or not lette:
+            yield _blocco_in_colonne(blocco, selezionate)
+    finally:
+        libro.close()
+
+
+def _unisci_categoriche(parti):
+    try:
+        return union_categoricals(parti, sort_categories=True)
+    except TypeError:
+        # Blocchi con categorie di tipo diverso (es. numeri e testo, o blocchi tutti vuoti)
+        return pd.Categorical(pd.concat([pd.Series(parte).astype(object) for parte in parti], ignore_index=True))
+
+
+def _categorie_numeriche(valori):
+    """
+    Come pd.read_excel: se tutte le categorie sono testi numerici (es. '-46', '+70') diventano numeri
+    """
+    categorie = valori.categories
+    if not pd.api.types.is_string_dtype(categorie.dtype):
+        return valori
+    try:
+        numeri = pd.to_numeric(categorie)
+    except (ValueError, TypeError):
+        return valori
+    if numeri.is_unique:
+        valori = valori.rename_categories(numeri)
+        return valori.reorder_categories(valori.categories.sort_values())
+    # Testi diversi per lo stesso numero (es. '70' e '+70'): si ricodifica
+    return pd.Categorical(pd.Series(valori).map(dict(zip(categorie, numeri))))
+
+
+def leggi_excel_streaming(file_path, sheet_name=SHEET_NAME, colonne=COLONNE_LETTE, max_righe=None,
+                          righe_per_blocco=RIGHE_PER_BLOCCO):
+    """
+    DataFrame del foglio letto a blocchi: in memoria restano solo le colonne tipizzate già lette
+    e le righe grezze di un blocco, mai l'intero workbook
+    """
+    parti = {}
+    for blocco in leggi_excel_a_blocchi(file_path, sheet_name, colonne, max_righe, righe_per_blocco):
+        for nome, valori in blocco.items():
+            parti.setdefault(nome, []).append(valori)
+
+    dati = {}
+    for nome, valori in parti.items():
+        if isinstance(valori[0], pd.Categorical):
+            dati[nome] = _categorie_numeriche(_unisci_categoriche(valori))
+        else:
+            colonna = pd.concat(valori, ignore_index=True)
+            # Blocchi con tipi dedotti diversi (es. date e celle vuote) si ricompongono a fine lettura
+            dati[nome] = colonna.infer_objects() if colonna.dtype == object else colonna
+    return pd.DataFrame(dati)
+
+
+def _leggi_excel(file_path, sheet_name):
+    """
+    Legge e valida il file Excel senza passare dalla cache; restituisce (df, scarti)
+    """
+    return valida_schema(leggi_excel_streaming(file_path, sheet_name))
+
+
+# --- SIDECAR COLONNARE (PARQUET) ---
+
+def percorso_sidecar(file_path, sheet_name=SHEET_NAME):
+    """
+    Percorso del sidecar Parquet accanto al file Excel (es. data/RL_U18.Sheet1.parquet)
+    """
+    base, _ = os.path.splitext(str(file_path))
+    return f"{base}.{sheet_name}.parquet"
+
+
+def _metadati_sidecar(percorso):
+    """
+    Legge dai metadati del sidecar la firma dell'Excel di origine, la versione dello schema
+    e le righe scartate: restituisce (firma, versione schema, scarti)
+    """
+    import pyarrow.parquet as pq
+
+    metadati = pq.read_schema(percorso).metadata or {}
+    if _META_SORGENTE not in metadati:
+        return None, None, []
+    sorgente = json.loads(metadati[_META_SORGENTE])
+    return tuple(sorgente['firma']), sorgente.get('schema'), json.loads(metadati.get(_META_SCARTI, b'[]'))
+
+
+def _versione_schema():
+    """
+    Versione dello schema registrata nel sidecar: cambia anche se cambiano le colonne lette
+    """
+    if COLONNE_LETTE is None:
+        return VERSIONE_SCHEMA
+    return f"{VERSIONE_SCHEMA}:{','.join(COLONNE_LETTE)}"
+
+
+def converti_in_sidecar(file_path, sheet_name=SHEET_NAME, forza=False):
+    """
+    Genera il sidecar Parquet del file Excel, solo se manca o se l'Excel (o lo schema) è cambiato.
+    Restituisce (df, scarti) appena letti dall'Excel, oppure None se il sidecar era già aggiornato.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    firma = firma_file(file_path)
+    sidecar = percorso_sidecar(file_path, sheet_name)
+    if not forza and os.path.isfile(sidecar) and _metadati_sidecar(sidecar)[:2] == (firma, _versione_schema()):
+        return None
+
+    df, scarti = _leggi_excel(file_path, sheet_name)
+    tabella = _metadati_sorgente(pa.Table.from_pandas(df, preserve_index=False), firma, scarti)
+
+    # Scrittura atomica: chi legge in parallelo non vede mai un file a metà
+    temporaneo = f"{sidecar}.{os.getpid()}.{threading.get_ident()}.tmp"
+    pq.write_table(tabella, temporaneo, compression='zstd')
+    os.replace(temporaneo, sidecar)
+    return df, scarti
+
+
+def _metadati_sorgente(tabella, firma, scarti):
+    """
+    Tabella Arrow con la firma dell'Excel di origine, la versione dello schema e le righe scartate nei metadati
+    """
+    metadati = dict(tabella.schema.metadata or {})
+    metadati[_META_SORGENTE] = json.dumps({'firma': list(firma), 'schema': _versione_schema()}).encode()
+    metadati[_META_SCARTI] = json.dumps(scarti).encode()
+    return tabella.replace_schema_metadata(metadati)
+
+
+# --- ARCHIVIO CONDIVISO TRA PROCESSI (ARROW IPC MAPPATO IN MEMORIA) ---
+# Con più processi sulla stessa macchina (avvio_multiprocesso.py) ogni lista viene letta una sola volta:
+# il primo processo scrive un file Arrow IPC non compresso, tutti lo mappano in memoria e le colonne
+# numeriche e testuali puntano direttamente alle pagine del file, condivise dal sistema operativo.
+
+def percorso_archivio(file_path, sheet_name=SHEET_NAME):
+    """
+    Percorso dell'archivio Arrow accanto al file Excel (es. data/RL_U18.Sheet1.arrow)
+    """
+    base, _ = os.path.splitext(str(file_path))
+    return f"{base}.{sheet_name}.arrow"
+
+
+@contextmanager
+def _lock_tra_processi(percorso):
+    """
+    Lock esclusivo su file: tra i processi della macchina uno solo genera l'archivio
+    """
+    try:
+        import fcntl
+    except ImportError:
+        # Sistemi senza fcntl: al più due processi generano lo stesso archivio (la scrittura resta atomica)
+        yield
+        return
+    with open(f"{percorso}.lock", 'w') as file_lock:
+        fcntl.flock(file_lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file_lock, fcntl.LOCK_UN)
+
+
+def _apri_archivio(percorso, firma):
+    """
+    Mappa in memoria l'archivio se generato dalla stessa versione dell'Excel; restituisce (df, scarti) o None
+    """
+    import pyarrow as pa
+
+    try:
+        lettore = pa.ipc.open_file(pa.memory_map(percorso))
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    metadati = lettore.schema.metadata or {}
+    if _META_SORGENTE not in metadati:
+        return None
+    sorgente = json.loads(metadati[_META_SORGENTE])
+    if (tuple(sorgente['firma']), sorgente.get('schema')) != (firma, _versione_schema()):
+        return None
+    # split_blocks: niente consolidamento dei blocchi pandas, che copierebbe le colonne mappate
+    df = _tipizza(lettore.read_all().to_pandas(split_blocks=True))
+    return df, json.loads(metadati.get(_META_SCARTI, b'[]'))
+
+
+def _scrivi_archivio(df, scarti, firma, percorso):
+    import pyarrow as pa
 
-def carica_dati(file_path, sheet_name='Sheet1'):
+    tabella = _metadati_sorgente(pa.Table.from_pandas(df, preserve_index=False), firma, scarti)
+    temporaneo = f"{percorso}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with pa.OSFile(temporaneo, 'wb') as file:
+        with pa.ipc.new_file(file, tabella.schema) as scrittore:
+            scrittore.write_table(tabella)
+    # I processi che hanno mappato la versione precedente continuano a leggerla finché la usano
+    os.replace(temporaneo, percorso)
+
+
+def _leggi_archivio(file_path, sheet_name):
+    """
+    Legge i dati dall'archivio condiviso, generandolo (una sola volta per macchina) se manca o è superato
+    """
+    percorso = percorso_archivio(file_path, sheet_name)
+    firma = firma_file(file_path)
+    with fase('lettura_archivio') as misura:
+        letti = _apri_archivio(percorso, firma)
+        if letti is None:
+            with _lock_tra_processi(percorso):
+                # Un altro processo potrebbe averlo appena generato
+                letti = _apri_archivio(percorso, firma)
+                if letti is None:
+                    df, scarti = _leggi_dati_processo(file_path, sheet_name)
+                    _scrivi_archivio(df, scarti, firma, percorso)
+                    letti = _apri_archivio(percorso, firma) or (df, scarti)
+        misura.righe = len(letti[0])
+    return letti
+
+
+def _leggi_dati(file_path, sheet_name):
+    """
+    Legge i dati dall'archivio condiviso (modalità multi-processo) oppure dal sidecar/Excel.
+    Restituisce (df, scarti).
+    """
+    if MEMORIA_CONDIVISA:
+        try:
+            return _leggi_archivio(file_path, sheet_name)
+        except ImportError:
+            pass
+    return _leggi_dati_processo(file_path, sheet_name)
+
+
+def _leggi_dati_processo(file_path, sheet_name):
+    """
+    Legge i dati dal sidecar Parquet se aggiornato, altrimenti dall'Excel (rigenerando il sidecar).
+    Restituisce (df, scarti).
+    """
+    if not USA_SIDECAR:
+        with fase('lettura_excel') as misura:
+            letti = _leggi_excel(file_path, sheet_name)
+            misura.righe = len(letti[0])
+        return letti
+    try:
+        with fase('lettura_excel') as misura:
+            letti = converti_in_sidecar(file_path, sheet_name)
+            misura.righe = len(letti[0]) if letti is not None else 0
+    except ImportError:
+        # pyarrow non installato: si resta sulla lettura diretta dell'Excel
+        return _leggi_excel(file_path, sheet_name)
+    if letti is None:
+        with fase('lettura_sidecar') as misura:
+            sidecar = percorso_sidecar(file_path, sheet_name)
+            # Le categoriche non testuali (es. Categoria) tornano come interi: si ri-tipizzano
+            letti = _tipizza(pd.read_parquet(sidecar)), _metadati_sidecar(sidecar)[2]
+            misura.righe = len(letti[0])
+    return letti
+
+
+def _cerca_in_cache(chiave, firma, adesso, ttl):
+    with _cache_lock:
+        voce = _cache.get(chiave)
+    if voce is not None:
+        firma_cache, caricato_il, df = voce
+        if firma_cache == firma and (ttl is None or adesso - caricato_il < ttl):
+            return df
+    return None
+
+
+def _carica_con_firma(file_path, sheet_name, ttl):
+    """
+    Come carica_dati, ma restituisce anche la firma del file da cui provengono i dati
+    """
+    chiave = (os.path.abspath(file_path), sheet_name)
+    if _aggiornamento_in_background:
+        # Il watcher ricarica i file cambiati fuori dalle richieste: si serve la versione corrente
+        with _cache_lock:
+            voce = _cache.get(chiave)
+        if voce is not None:
+            conta_cache('dati', True)
+            return voce[0], voce[2]
+
+    firma = firma_file(file_path)
+    adesso = time.monotonic()
+    df = _cerca_in_cache(chiave, firma, adesso, ttl)
+    conta_cache('dati', df is not None)
+    if df is not None:
+        return firma, df
+
+    with _cache_lock:
+        lock = _lock_caricamento.setdefault(chiave, threading.Lock())
+    with lock:
+        # Un'altra sessione potrebbe averlo appena caricato
+        df = _cerca_in_cache(chiave, firma, adesso, ttl)
+        if df is None:
+            df, scarti = _leggi_dati(file_path, sheet_name)
+            with _cache_lock:
+                _cache[chiave] = (firma, time.monotonic(), df)
+                _scarti[chiave] = scarti
+    return firma, df
+
+
+def carica_dati(file_path, sheet_name='Sheet1', ttl=CACHE_TTL):
+    """
+    Funzione per caricare i dati dal file Excel (tramite il sidecar Parquet, se abilitato).
+    Il risultato è condiviso tra tutte le sessioni e viene riletto solo se il file
+    cambia su disco (mtime/dimensione) o se è più vecchio di `ttl` secondi.
+    Con il watcher attivo i file cambiati vengono invece ricaricati in background.
+    Il DataFrame restituito è condiviso: non va modificato sul posto.
+    """
+    return _carica_con_firma(file_path, sheet_name, ttl)[1]
+
+
+def svuota_cache():
+    """
+    Svuota la cache dei DataFrame caricati
+    """
+    with _cache_lock:
+        _cache.clear()
+        _viste_lista.clear()
+        _cache_combinati.clear()
+        _scarti.clear()
+
+
+# --- AGGIORNAMENTO IN BACKGROUND ---
+# Usato da modules/watcher.py: le liste cambiate su disco vengono rilette fuori dalle
+# richieste e sostituite atomicamente; le cache dipendenti ricevono una notifica.
+
+
+def attiva_aggiornamento_in_background():
+    """
+    Da chiamare quando un watcher si occupa di ricaricare i file: le richieste non rileggono più
+    i file cambiati su disco ma servono la versione già caricata finché il watcher non la sostituisce
+    """
+    global _aggiornamento_in_background
+    _aggiornamento_in_background = True
+
+
+def registra_invalidazione(funzione):
     """
-    Funzione per caricare i dati dal file Excel
+    Registra una funzione da chiamare (con il nome della Ranking List) quando una lista cambia
     """
-    df = pd.read_excel(file_path, sheet_name=sheet_name)
+    if funzione not in _invalidazioni:
+        _invalidazioni.append(funzione)
+
+
+def _notifica(ranking):
+    for funzione in list(_invalidazioni):
+        funzione(ranking)
+
+
+def firma_caricata(ranking, sheet_name=SHEET_NAME):
+    """
+    Firma del file da cui proviene la versione attualmente in memoria della lista (None se non caricata)
+    """
+    with _cache_lock:
+        voce = _cache.get((os.path.abspath(EXCEL_FILES[ranking]), sheet_name))
+    return voce[0] if voce is not None else None
+
+
+def ricarica_lista(ranking, sheet_name=SHEET_NAME):
+    """
+    Rilegge la Ranking List e sostituisce atomicamente la versione in memoria.
+    Solleva un'eccezione (lasciando intatta la versione corrente) se il file cambia durante la lettura
+    o non è leggibile, ad esempio perché ancora in scrittura.
+    """
+    file_path = EXCEL_FILES[ranking]
+    chiave = (os.path.abspath(file_path), sheet_name)
+    firma = firma_file(file_path)
+    df, scarti = _leggi_dati(file_path, sheet_name)
+    if firma_file(file_path) != firma:
+        raise OSError(f"{file_path} modificato durante la lettura")
+    with _cache_lock:
+        _cache[chiave] = (firma, time.monotonic(), df)
+        _scarti[chiave] = scarti
+        _viste_lista.pop((ranking, sheet_name), None)
+    _notifica(ranking)
     return df
+
+
+def rimuovi_lista(ranking, sheet_name=SHEET_NAME):
+    """
+    Elimina dalla memoria una Ranking List il cui file non esiste più
+    """
+    chiave = (os.path.abspath(EXCEL_FILES[ranking]), sheet_name)
+    with _cache_lock:
+        _cache.pop(chiave, None)
+        _scarti.pop(chiave, None)
+        _viste_lista.pop((ranking, sheet_name), None)
+        for combinata in [k for k in _cache_combinati if ranking in k[0]]:
+            del _cache_combinati[combinata]
+    _notifica(ranking)
+
+
+# --- CARICAMENTO DI PIÙ RANKING LIST ---
+# Pool condiviso e limitato: anche con molte sessioni non si superano MAX_WORKER_CARICAMENTO letture
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKER_CARICAMENTO, thread_name_prefix='carica_dati')
+# Chiave: (ranking, foglio) -> (firma, DataFrame della lista con la colonna COLONNA_LISTA)
+_viste_lista = {}
+# Solo le combinazioni di più liste (es. "Tutte"). Chiave: (liste, foglio, firme dei file) -> RisultatoCaricamento
+_cache_combinati = {}
+
+
+def _carica_lista(ranking, sheet_name):
+    """
+    Carica una singola Ranking List, restituendo (firma, DataFrame) oppure un FileMancante
+    """
+    file_path = EXCEL_FILES[ranking]
+    try:
+        return _carica_con_firma(file_path, sheet_name, CACHE_TTL)
+    except FileNotFoundError:
+        return FileMancante(ranking, file_path, 'non presente')
+    except Exception as errore:
+        return FileMancante(ranking, file_path, f"non leggibile ({errore})")
+
+
+def _vista_lista(ranking, sheet_name, firma, df):
+    """
+    Una sola lista come la restituisce carica_tutte: le colonne del DataFrame condiviso, senza copiarle,
+    più la colonna costante COLONNA_LISTA. Creata una volta per versione del file, così gli indici
+    costruiti sul DataFrame (per_dataset) restano validi tra le richieste.
+    """
+    chiave = (ranking, sheet_name)
+    with _cache_lock:
+        voce = _viste_lista.get(chiave)
+    if voce is not None and voce[0] == firma:
+        return voce[1]
+
+    vista = df.copy(deep=False)
+    codici = np.full(len(df), list(EXCEL_FILES).index(ranking))
+    vista[COLONNA_LISTA] = pd.Categorical.from_codes(codici, categories=list(EXCEL_FILES))
+    with _cache_lock:
+        # Se un'altra richiesta l'ha appena creata si usa la sua
+        voce = _viste_lista.get(chiave)
+        if voce is not None and voce[0] == firma:
+            return voce[1]
+        _viste_lista[chiave] = (firma, vista)
+    return vista
+
+
+def _concatena(dfs, liste):
+    """
+    Unisce i DataFrame mantenendo categoriche le colonne categoriche (categorie unite)
+    """
+    parti = []
+    for ranking, df in zip(liste, dfs):
+        parte = df.copy(deep=False)
+        parte[COLONNA_LISTA] = ranking
+        parti.append(parte)
+
+    for colonna in COLONNE_CATEGORICHE:
+        if all(colonna in p.columns and isinstance(p[colonna].dtype, pd.CategoricalDtype) for p in parti):
+            categorie = union_categoricals([p[colonna] for p in parti]).categories
+            for parte in parti:
+                parte[colonna] = parte[colonna].cat.set_categories(categorie)
+
+    df = pd.concat(parti, ignore_index=True)
+    df[COLONNA_LISTA] = pd.Categorical(df[COLONNA_LISTA], categories=list(EXCEL_FILES))
+    return df
+
+
+def carica_tutte(liste=None, sheet_name=SHEET_NAME):
+    """
+    Carica in parallelo le Ranking List indicate (di default tutte quelle in EXCEL_FILES)
+    e le unisce in un unico DataFrame con la colonna 'Ranking List'.
+    Una lista sola non viene copiata: si restituisce il suo DataFrame condiviso con la colonna aggiunta.
+    I file mancanti o illeggibili sono riportati in `mancanti` invece di interrompere il caricamento.
+    """
+    liste = list(EXCEL_FILES) if liste is None else list(liste)
+    esiti = list(_pool.map(lambda ranking: _carica_lista(ranking, sheet_name), liste))
+
+    mancanti = [esito for esito in esiti if isinstance(esito, FileMancante)]
+    caricate = [(r, e) for r, e in zip(liste, esiti) if not isinstance(e, FileMancante)]
+    firme = tuple((ranking, firma) for ranking, (firma, _) in caricate)
+    chiave = (tuple(liste), sheet_name, firme)
+    versione = hashlib.sha1(repr(chiave).encode()).hexdigest()[:12]
+
+    if len(caricate) <= 1:
+        df = pd.DataFrame()
+        for ranking, (firma, dati) in caricate:
+            df = _vista_lista(ranking, sheet_name, firma, dati)
+        return RisultatoCaricamento(df, mancanti, versione)
+
+    with _cache_lock:
+        risultato = _cache_combinati.get(chiave)
+    conta_cache('combinati', risultato is not None)
+    if risultato is not None:
+        return risultato
+
+    with fase('concatena') as misura:
+        df = _concatena([df for _, (_, df) in caricate], [ranking for ranking, _ in caricate])
+        misura.righe = len(df)
+    risultato = RisultatoCaricamento(df, mancanti, versione)
+
+    with _cache_lock:
+        # Le combinazioni con firme ormai superate non servono più
+        for vecchia in [k for k in _cache_combinati if k[:2] == chiave[:2]]:
+            del _cache_combinati[vecchia]
+        _cache_combinati[chiave] = risultato
+    return risultato
+
+
+def scarti_schema(ranking, sheet_name=SHEET_NAME):
+    """
+    Righe scartate dalla validazione all'ultimo caricamento della Ranking List
+    """
+    with _cache_lock:
+        return list(_scarti.get((os.path.abspath(EXCEL_FILES[ranking]), sheet_name), []))
+
+
+def report_memoria(sheet_name=SHEET_NAME):
+    """
+    Memoria occupata da ogni Ranking List condivisa (colonna COLONNA_LISTA compresa) e da ogni
+    combinazione di più liste in cache: lista di (nome, righe, bytes)
+    """
+    report = []
+    with _cache_lock:
+        voci = {ranking: _cache.get((os.path.abspath(file_path), sheet_name))
+                for ranking, file_path in EXCEL_FILES.items()}
+        viste = dict(_viste_lista)
+        combinati = [(k[0], v.dati) for k, v in _cache_combinati.items() if k[1] == sheet_name]
+    for ranking, voce in voci.items():
+        if voce is not None:
+            df = voce[2]
+            occupati = int(df.memory_usage(deep=True).sum())
+            vista = viste.get((ranking, sheet_name))
+            if vista is not None:
+                # La vista condivide le colonne della lista: conta solo la colonna aggiunta
+                occupati += int(vista[1][COLONNA_LISTA].memory_usage(deep=True, index=False))
+            report.append((ranking, len(df), occupati))
+    for liste, df in combinati:
+        nome = 'Tutte' if set(liste) == set(EXCEL_FILES) else ' + '.join(liste)
+        report.append((nome, len(df), int(df.memory_usage(deep=True).sum())))
+    return report
+
+
+def converti_tutti(forza=False):
+    """
+    Pre-converte in sidecar Parquet tutti i file elencati in EXCEL_FILES
+    """
+    for ranking, file_path in EXCEL_FILES.items():
+        if not os.path.isfile(file_path):
+            print(f"⚠️ Ranking {ranking} non presente ({file_path}).")
+            continue
+        inizio = time.perf_counter()
+        letti = converti_in_sidecar(file_path, SHEET_NAME, forza=forza)
+        durata = time.perf_counter() - inizio
+        if letti is None:
+            print(f"✅ Ranking {ranking}: sidecar già aggiornato.")
+        else:
+            df, scarti = letti
+            print(f"✅ Ranking {ranking}: {len(df)} righe convertite in {durata:.2f}s.")
+            for scarto in scarti:
+                print(f"   ⚠️ riga {scarto['riga']} scartata: {scarto['motivo']}")
+
+
+def prepara_archivi():
+    """
+    Genera (o verifica) l'archivio condiviso di tutte le Ranking List presenti, prima di avviare i processi
+    """
+    for ranking, file_path in EXCEL_FILES.items():
+        if not os.path.isfile(file_path):
+            print(f"⚠️ Ranking {ranking} non presente ({file_path}).")
+            continue
+        inizio = time.perf_counter()
+        df, _ = _leggi_archivio(file_path, SHEET_NAME)
+        print(f"✅ Ranking {ranking}: {len(df)} righe nell'archivio condiviso ({time.perf_counter() - inizio:.2f}s).")
+
+
+if __name__ == '__main__':
+    # Uso al deploy: python -m modules.data_loader [--forza]
+    parser = argparse.ArgumentParser(description="Converte le Ranking List Excel in sidecar Parquet")
+    parser.add_argument('--forza', action='store_true', help="rigenera anche i sidecar già aggiornati")
+    parser.add_argument('--memoria', action='store_true', help="stampa la memoria occupata da ogni lista")
+    parser.add_argument('--archivio', action='store_true', help="genera anche l'archivio Arrow condiviso tra processi")
+    args = parser.parse_args()
+    converti_tutti(forza=args.forza)
+    if args.archivio:
+        prepara_archivi()
+    if args.memoria:
+        carica_tutte()
+        for ranking, righe, occupati in report_memoria():
+            print(f"📦 Ranking {ranking}: {righe} righe, {occupati / 1024:.0f} KB in memoria.")
@@ -1,12 +1,122 @@
 # modules/exporter.py
-import pandas as pd   # <-- AGGIUNGI QUESTO IMPORT
 import io
+import threading
+from collections import OrderedDict
 
-def esporta_excel(df, file_name='classifica_judo.xlsx'):
+import pandas as pd
+
+from config.settings import EXPORT_CACHE_MAX_BYTES
+from modules.data_loader import registra_invalidazione
+from modules.metriche import conta_cache, fase
+
+FORMATI = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Righe convertite per blocco durante la scrittura (limita la memoria di picco)
+RIGHE_PER_BLOCCO = 5000
+
+# --- CACHE DEGLI EXPORT ---
+# Chiave: (chiave della vista, formato) -> bytes. LRU limitata in byte totali.
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def _valore_excel(valore):
     """
-    Esporta il DataFrame in formato Excel
+    Converte i valori non scrivibili da xlsxwriter (None, NaN, NaT, pd.NA, Timestamp)
     """
+    if pd.api.types.is_scalar(valore) and pd.isna(valore):
+        return None
+    if isinstance(valore, pd.Timestamp):
+        return valore.to_pydatetime()
+    return valore
+
+
+def _esporta_xlsx(df):
+    import xlsxwriter
+
     buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False)
+    # constant_memory: le righe vanno su file temporanei man mano, senza tenere il foglio in memoria
+    workbook = xlsxwriter.Workbook(buffer, {'constant_memory': True, 'default_date_format': 'dd/mm/yyyy'})
+    foglio = workbook.add_worksheet()
+    foglio.write_row(0, 0, [str(colonna) for colonna in df.columns])
+    riga = 1
+    for inizio in range(0, len(df), RIGHE_PER_BLOCCO):
+        blocco = df.iloc[inizio:inizio + RIGHE_PER_BLOCCO].astype(object)
+        for valori in blocco.itertuples(index=False, name=None):
+            foglio.write_row(riga, 0, [_valore_excel(valore) for valore in valori])
+            riga += 1
+    workbook.close()
     return buffer.getvalue()
+
+
+def _esporta_csv(df):
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, encoding='utf-8-sig', chunksize=RIGHE_PER_BLOCCO)
+    return buffer.getvalue()
+
+
+def _esporta_parquet(df):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+_ESPORTATORI = {'xlsx': _esporta_xlsx, 'csv': _esporta_csv, 'parquet': _esporta_parquet}
+
+
+def esporta(df, formato='xlsx'):
+    """
+    Esporta il DataFrame nel formato richiesto (xlsx, csv, parquet) e restituisce i bytes
+    """
+    with fase(f"export_{formato}", righe=len(df)):
+        return _ESPORTATORI[formato](df)
+
+
+def esporta_in_cache(chiave, genera_df, formato='xlsx'):
+    """
+    Come esporta, ma riusa i bytes già generati per la stessa vista (chiave = stato dei filtri).
+    `genera_df` è chiamata solo se l'export non è in cache.
+    """
+    global _cache_bytes
+    with _cache_lock:
+        dati = _cache.get((chiave, formato))
+        conta_cache('export', dati is not None)
+        if dati is not None:
+            _cache.move_to_end((chiave, formato))
+            return dati
+
+    dati = esporta(genera_df(), formato)
+    with _cache_lock:
+        if (chiave, formato) not in _cache and len(dati) <= EXPORT_CACHE_MAX_BYTES:
+            _cache[(chiave, formato)] = dati
+            _cache_bytes += len(dati)
+            while _cache_bytes > EXPORT_CACHE_MAX_BYTES:
+                _, vecchi = _cache.popitem(last=False)
+                _cache_bytes -= len(vecchi)
+    return dati
+
+
+def svuota_cache():
+    """
+    Svuota la cache degli export
+    """
+    global _cache_bytes
+    with _cache_lock:
+        _cache.clear()
+        _cache_bytes = 0
+
+
+# Gli export di una versione superata non verranno più richiesti: si libera la memoria
+registra_invalidazione(lambda ranking: svuota_cache())
+
+
+def esporta_excel(df, file_name='classifica_judo.xlsx'):
+    """
+    Esporta il DataFrame in formato Excel
+    """
+    return esporta(df, 'xlsx')
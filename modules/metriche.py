@@ -0,0 +1,206 @@
+# modules/metriche.py
+
+import json
+import logging
+import os
+import resource
+import threading
+import time
+
+from config.settings import METRICHE_ATTIVE
+
+logger = logging.getLogger(__name__)
+
+# Limiti (in secondi) degli istogrammi delle durate, come nei bucket Prometheus
+LIMITI_DURATA = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+_attive = METRICHE_ATTIVE
+_lock = threading.Lock()
+# Fase -> [chiamate, secondi totali, secondi massimi, righe totali, conteggi per bucket]
+_fasi = {}
+# (cache, esito) -> conteggio; esito è 'hit' o 'miss'
+_cache = {}
+# Traccia e raccolta della sola richiesta (rerun Streamlit) in corso nel thread corrente
+_locale = threading.local()
+
+
+def attive():
+    """
+    True se le metriche si raccolgono nel thread corrente (per tutto il processo o per la sua richiesta)
+    """
+    return _attive or getattr(_locale, 'attive', False)
+
+
+def attiva(stato=True):
+    """
+    Attiva o disattiva la raccolta delle metriche per tutto il processo
+    """
+    global _attive
+    _attive = stato
+
+
+def attiva_richiesta(stato=True):
+    """
+    Attiva o disattiva la raccolta delle metriche solo per la richiesta (rerun) del thread corrente:
+    le altre sessioni non ne sono toccate
+    """
+    _locale.attive = stato
+
+
+def azzera():
+    with _lock:
+        _fasi.clear()
+        _cache.clear()
+
+
+def memoria_rss():
+    """
+    Memoria residente del processo in byte (massimo raggiunto dove /proc non è disponibile)
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Fase:
+    """
+    Misura di una fase: durata, righe elaborate (impostabili anche dentro il blocco) e memoria a fine fase
+    """
+
+    __slots__ = ('nome', 'righe', 'inizio')
+
+    def __init__(self, nome, righe):
+        self.nome = nome
+        self.righe = righe
+
+    def __enter__(self):
+        self.inizio = time.perf_counter()
+        return self
+
+    def __exit__(self, *errore):
+        durata = time.perf_counter() - self.inizio
+        righe = int(self.righe or 0)
+        with _lock:
+            voce = _fasi.get(self.nome)
+            if voce is None:
+                voce = _fasi[self.nome] = [0, 0.0, 0.0, 0, [0] * (len(LIMITI_DURATA) + 1)]
+            voce[0] += 1
+            voce[1] += durata
+            voce[2] = max(voce[2], durata)
+            voce[3] += righe
+            voce[4][next((i for i, limite in enumerate(LIMITI_DURATA) if durata <= limite), len(LIMITI_DURATA))] += 1
+        memoria = memoria_rss()
+        traccia = getattr(_locale, 'traccia', None)
+        if traccia is not None:
+            traccia.append({'fase': self.nome, 'ms': durata * 1000, 'righe': righe, 'rss_mb': memoria / 2 ** 20})
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({'fase': self.nome, 'ms': round(durata * 1000, 3), 'righe': righe,
+                                    'rss': memoria, 'errore': errore[0] is not None}))
+        return False
+
+
+class _FaseVuota:
+    """
+    Contesto che non misura nulla: usato quando le metriche sono disattivate
+    """
+
+    __slots__ = ('righe',)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *errore):
+        return False
+
+
+_VUOTA = _FaseVuota()
+
+
+def fase(nome, righe=None):
+    """
+    Contesto che misura una fase: `with fase('filtri') as f: ...; f.righe = n`.
+    Con le metriche disattivate restituisce un contesto vuoto condiviso.
+    """
+    if not attive():
+        return _VUOTA
+    return _Fase(nome, righe)
+
+
+def conta_cache(cache, trovato):
+    """
+    Registra un accesso alla cache indicata (trovato = hit)
+    """
+    if not attive():
+        return
+    chiave = (cache, 'hit' if trovato else 'miss')
+    with _lock:
+        _cache[chiave] = _cache.get(chiave, 0) + 1
+
+
+# --- TRACCIA PER RICHIESTA ---
+
+def inizia_traccia():
+    """
+    Inizia a raccogliere le fasi della richiesta (rerun) eseguita nel thread corrente
+    """
+    _locale.traccia = [] if attive() else None
+
+
+def traccia():
+    return list(getattr(_locale, 'traccia', None) or [])
+
+
+# --- ESPOSIZIONE ---
+
+def riepilogo():
+    """
+    Restituisce (fasi, cache): per fase chiamate, ms totali/medi/massimi e righe; per cache hit, miss e hit rate
+    """
+    with _lock:
+        fasi = [
+            {'fase': nome, 'chiamate': chiamate, 'ms_totali': totale * 1000, 'ms_medi': totale * 1000 / chiamate,
+             'ms_massimi': massimo * 1000, 'righe': righe}
+            for nome, (chiamate, totale, massimo, righe, _) in sorted(_fasi.items())
+        ]
+        nomi = sorted({cache for cache, _ in _cache})
+        cache = []
+        for nome in nomi:
+            hit, miss = _cache.get((nome, 'hit'), 0), _cache.get((nome, 'miss'), 0)
+            cache.append({'cache': nome, 'hit': hit, 'miss': miss, 'hit_rate': hit / (hit + miss) if hit + miss else 0.0})
+    return fasi, cache
+
+
+def _etichetta(valore):
+    return str(valore).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def testo_prometheus():
+    """
+    Metriche nel formato di esposizione testuale di Prometheus
+    """
+    righe = [
+        '# HELP ranking_fase_secondi Durata delle fasi della dashboard.',
+        '# TYPE ranking_fase_secondi histogram',
+    ]
+    with _lock:
+        fasi = sorted((nome, list(voce[:4]), list(voce[4])) for nome, voce in _fasi.items())
+        cache = sorted(_cache.items())
+    for nome, (chiamate, totale, _, _), conteggi in fasi:
+        etichetta = _etichetta(nome)
+        cumulato = 0
+        for limite, conteggio in zip(LIMITI_DURATA, conteggi):
+            cumulato += conteggio
+            righe.append(f'ranking_fase_secondi_bucket{{fase="{etichetta}",le="{limite}"}} {cumulato}')
+        righe.append(f'ranking_fase_secondi_bucket{{fase="{etichetta}",le="+Inf"}} {chiamate}')
+        righe.append(f'ranking_fase_secondi_sum{{fase="{etichetta}"}} {totale:.6f}')
+        righe.append(f'ranking_fase_secondi_count{{fase="{etichetta}"}} {chiamate}')
+    righe += ['# HELP ranking_fase_righe_total Righe elaborate dalle fasi.', '# TYPE ranking_fase_righe_total counter']
+    righe += [f'ranking_fase_righe_total{{fase="{_etichetta(nome)}"}} {valori[3]}' for nome, valori, _ in fasi]
+    righe += ['# HELP ranking_cache_accessi_total Accessi alle cache per esito.', '# TYPE ranking_cache_accessi_total counter']
+    righe += [f'ranking_cache_accessi_total{{cache="{_etichetta(nome)}",esito="{esito}"}} {conteggio}'
+              for (nome, esito), conteggio in cache]
+    righe += ['# HELP ranking_memoria_rss_byte Memoria residente del processo.', '# TYPE ranking_memoria_rss_byte gauge',
+              f'ranking_memoria_rss_byte {memoria_rss()}']
+    return '\n'.join(righe) + '\n'
@@ -0,0 +1,85 @@
+# modules/prefetch.py
+
+import itertools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import PREFETCH_ATTIVO, PREFETCH_WORKER
+from modules.metriche import fase
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """
+    Esegue in background i calcoli delle viste che l'utente chiederà probabilmente dopo quella servita
+    (pagine vicine, altre Categorie), scaldando la cache condivisa dei risultati.
+    Ogni sessione ha al più un gruppo di lavori attivo: un nuovo gruppo annulla quello precedente,
+    che si ferma al primo lavoro non ancora iniziato.
+    """
+
+    def __init__(self, worker=PREFETCH_WORKER):
+        self._pool = ThreadPoolExecutor(max_workers=worker, thread_name_prefix='prefetch')
+        self._lock = threading.Lock()
+        # Sessione -> (generazione corrente, future del gruppo in corso); le generazioni non si ripetono mai
+        self._sessioni = {}
+        self._generazioni = itertools.count(1)
+
+    def _corrente(self, sessione, generazione):
+        with self._lock:
+            voce = self._sessioni.get(sessione)
+            return voce is not None and voce[0] == generazione
+
+    def _esegui(self, sessione, generazione, lavori):
+        eseguiti = 0
+        for lavoro in lavori:
+            if not self._corrente(sessione, generazione):
+                break
+            try:
+                with fase('prefetch'):
+                    lavoro()
+                eseguiti += 1
+            except Exception:
+                # Un prefetch fallito non deve mai disturbare la richiesta: la vista verrà calcolata al bisogno
+                logger.exception("Prefetch non riuscito")
+        with self._lock:
+            voce = self._sessioni.get(sessione)
+            if voce is not None and voce[0] == generazione:
+                del self._sessioni[sessione]
+        return eseguiti
+
+    def programma(self, sessione, lavori):
+        """
+        Sostituisce i lavori in attesa della sessione con `lavori` (funzioni senza argomenti, in ordine di priorità)
+        """
+        with self._lock:
+            _, precedente = self._sessioni.get(sessione, (None, None))
+            if precedente is not None:
+                precedente.cancel()
+            generazione = next(self._generazioni)
+            # Il worker controlla la generazione sotto lo stesso lock: vede già quella nuova
+            future = self._pool.submit(self._esegui, sessione, generazione, list(lavori))
+            self._sessioni[sessione] = (generazione, future)
+        return future
+
+    def annulla(self, sessione):
+        """
+        Annulla i lavori in attesa della sessione
+        """
+        with self._lock:
+            voce = self._sessioni.pop(sessione, None)
+        if voce is not None:
+            voce[1].cancel()
+
+
+_prefetcher = Prefetcher()
+
+
+def programma(sessione, lavori):
+    """
+    Programma il prefetch della sessione (nessun effetto se PREFETCH_ATTIVO è False)
+    """
+    if not PREFETCH_ATTIVO:
+        return None
+    return _prefetcher.programma(sessione, lavori)
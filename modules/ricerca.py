@@ -0,0 +1,203 @@
+# modules/ricerca.py
+
+import difflib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Punteggi di pertinenza (più basso = più pertinente)
+ESATTO, INIZIO, INIZIO_PAROLA, CONTIENE, SIMILE = range(5)
+
+_NON_ALFANUMERICI = re.compile(r"[^0-9a-z]+")
+
+
+def normalizza(testo):
+    """
+    Normalizza un testo per la ricerca: minuscolo, senza accenti né apostrofi
+    ("Nicolò" e "NICOLO'" diventano entrambi "nicolo")
+    """
+    if not isinstance(testo, str):
+        return ''
+    testo = unicodedata.normalize('NFKD', testo.casefold())
+    testo = ''.join(c for c in testo if not unicodedata.combining(c))
+    testo = testo.replace("'", '').replace('’', '').replace('`', '')
+    return _NON_ALFANUMERICI.sub(' ', testo).strip()
+
+
+def _trigrammi(testo):
+    return {testo[i:i + 3] for i in range(len(testo) - 2)}
+
+
+class IndiceRicerca:
+    """
+    Indice a trigrammi sui valori distinti di una colonna (es. Nome, Società).
+    Le ricerche sono in AND sulle parole della query; una query che estende la
+    precedente viene risolta restringendo i risultati già trovati.
+    """
+
+    def __init__(self, serie, memoria=256):
+        codici, valori = pd.factorize(serie, sort=False)
+        self.valori = list(valori)
+        self.testi = [normalizza(v) for v in self.valori]
+
+        # Righe del DataFrame per ogni valore distinto
+        ordine = np.argsort(codici, kind='stable')
+        confini = np.searchsorted(codici[ordine], np.arange(len(self.valori) + 1))
+        self._ordine = ordine
+        self._confini = confini
+
+        # Trigramma -> id dei valori che lo contengono; parola -> id dei valori (per la tolleranza)
+        trigrammi = {}
+        parole = {}
+        for id_valore, testo in enumerate(self.testi):
+            for trigramma in _trigrammi(testo):
+                trigrammi.setdefault(trigramma, []).append(id_valore)
+            for parola in set(testo.split()):
+                parole.setdefault(parola, []).append(id_valore)
+        self._trigrammi = {t: np.array(ids, dtype=np.int64) for t, ids in trigrammi.items()}
+        self._parole = {p: np.array(ids, dtype=np.int64) for p, ids in parole.items()}
+        self._vocabolario = list(self._parole)
+
+        # Ultime query risolte (condivise tra le sessioni): query normalizzata -> id trovati
+        self._recenti = OrderedDict()
+        self._memoria = memoria
+        self._lock = threading.Lock()
+
+    # --- RICERCA ---
+
+    def _candidati(self, parola):
+        """
+        Id dei valori che potrebbero contenere la parola, secondo i trigrammi
+        """
+        candidati = None
+        for trigramma in _trigrammi(parola):
+            ids = self._trigrammi.get(trigramma)
+            if ids is None:
+                return np.empty(0, dtype=np.int64)
+            candidati = ids if candidati is None else np.intersect1d(candidati, ids, assume_unique=True)
+        return candidati
+
+    def _precedente(self, query):
+        """
+        Risultati di una query più corta di cui questa è un'estensione (ricerca incrementale)
+        """
+        with self._lock:
+            # Ogni parola di un prefisso è contenuta in una parola della query:
+            # i risultati del prefisso sono quindi un sovrainsieme di quelli della query
+            for fine in range(len(query) - 1, 0, -1):
+                prefisso = query[:fine].strip()
+                if prefisso in self._recenti:
+                    return self._recenti[prefisso]
+        return None
+
+    def _memorizza(self, query, ids):
+        with self._lock:
+            self._recenti[query] = ids
+            self._recenti.move_to_end(query)
+            while len(self._recenti) > self._memoria:
+                self._recenti.popitem(last=False)
+
+    def _contenenti(self, query):
+        """
+        Id (ordinati) dei valori che contengono tutte le parole della query
+        """
+        with self._lock:
+            trovati = self._recenti.get(query)
+        if trovati is not None:
+            return trovati
+
+        parole = query.split()
+        candidati = self._precedente(query)
+        for parola in parole:
+            if len(parola) >= 3:
+                ids = self._candidati(parola)
+                candidati = ids if candidati is None else np.intersect1d(candidati, ids, assume_unique=True)
+        if candidati is None:
+            candidati = np.arange(len(self.testi))
+        trovati = np.array(
+            [i for i in candidati if all(parola in self.testi[i] for parola in parole)], dtype=np.int64
+        )
+        self._memorizza(query, trovati)
+        return trovati
+
+    def _simili(self, query):
+        """
+        Id dei valori in cui ogni parola della query compare esatta o con un piccolo errore di battitura
+        """
+        risultato = None
+        for parola in query.split():
+            ids = [self._candidati(parola) if len(parola) >= 3 else np.arange(len(self.testi))]
+            for simile in difflib.get_close_matches(parola, self._vocabolario, n=5, cutoff=0.75):
+                ids.append(self._parole[simile])
+            ids = np.unique(np.concatenate(ids))
+            ids = np.array(
+                [i for i in ids if parola in self.testi[i] or any(
+                    difflib.SequenceMatcher(None, parola, p).ratio() >= 0.75 for p in self.testi[i].split()
+                )],
+                dtype=np.int64,
+            )
+            risultato = ids if risultato is None else np.intersect1d(risultato, ids, assume_unique=True)
+        return risultato if risultato is not None else np.empty(0, dtype=np.int64)
+
+    def _punteggio(self, query, id_valore):
+        testo = self.testi[id_valore]
+        if testo == query:
+            return ESATTO
+        if testo.startswith(query):
+            return INIZIO
+        if any(parola.startswith(query.split()[0]) for parola in testo.split()):
+            return INIZIO_PAROLA
+        if all(parola in testo for parola in query.split()):
+            return CONTIENE
+        return SIMILE
+
+    def cerca(self, query, tolleranza=False):
+        """
+        Valori trovati per la query, ordinati per pertinenza: lista di (valore, punteggio).
+        Con `tolleranza` e nessun risultato esatto, accetta piccoli errori di battitura.
+        """
+        query = normalizza(query)
+        if not query:
+            return []
+        ids = self._contenenti(query)
+        if len(ids) == 0 and tolleranza:
+            ids = self._simili(query)
+        punteggi = [(self._punteggio(query, i), self.testi[i], i) for i in ids]
+        punteggi.sort()
+        return [(self.valori[i], punteggio) for punteggio, _, i in punteggi]
+
+    def ids(self, query, tolleranza=False):
+        """
+        Id dei valori distinti trovati per la query (in ordine di indice)
+        """
+        query = normalizza(query)
+        if not query:
+            return None
+        ids = self._contenenti(query)
+        if len(ids) == 0 and tolleranza:
+            ids = self._simili(query)
+        return ids
+
+    def righe(self, query, tolleranza=False):
+        """
+        Posizioni (ordinate) delle righe del DataFrame che corrispondono alla query.
+        Restituisce None per una query vuota (nessun filtro).
+        """
+        ids = self.ids(query, tolleranza)
+        if ids is None:
+            return None
+        if len(ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([self._ordine[self._confini[i]:self._confini[i + 1]] for i in ids]))
+
+    def valori_trovati(self, query, tolleranza=False):
+        """
+        Valori distinti che corrispondono alla query (None per una query vuota)
+        """
+        ids = self.ids(query, tolleranza)
+        return None if ids is None else [self.valori[i] for i in ids]
+
@@ -0,0 +1,319 @@
+# modules/storico.py
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from config.settings import CARTELLA_STORICO, CARTELLA_STORICO_SOCIETA, EXCEL_FILES, SHEET_NAME
+from modules import data_loader
+from modules.metriche import conta_cache, fase
+
+# Colonne conservate negli snapshot e identità dell'atleta usata per il confronto
+COLONNE_SNAPSHOT = ['Nome', 'Società', 'Categoria', 'Sesso', 'Nazione', 'Ranking', 'Punti']
+IDENTITA = ['Nome', 'Società', 'Categoria']
+FORMATO_ISTANTE = '%Y%m%dT%H%M%S'
+_META_SORGENTE = b'ranking_sorgente'
+
+STATI = ('Nuovo', 'Salito', 'Sceso', 'Stabile', 'Uscito')
+
+# Gli snapshot sono immutabili: i confronti già calcolati restano validi
+_cache_confronti = OrderedDict()
+_CONFRONTI_IN_CACHE = 64
+# Serie storiche già lette; svuotata a ogni scrittura nello storico
+_cache_andamenti = OrderedDict()
+_ANDAMENTI_IN_CACHE = 256
+_lock = threading.Lock()
+
+
+def _cartella_lista(ranking, radice=CARTELLA_STORICO):
+    return os.path.join(radice, f"lista={ranking}")
+
+
+def percorso_snapshot(ranking, istante, radice=CARTELLA_STORICO):
+    """
+    File dello snapshot, partizionato per lista e istante di importazione
+    (data/storico/lista=U18/snapshot=20250301T120000/dati.parquet)
+    """
+    return os.path.join(_cartella_lista(ranking, radice), f"snapshot={istante}", 'dati.parquet')
+
+
+def _scrivi(tabella, percorso):
+    """
+    Scrittura atomica; il file temporaneo inizia con '.' così la lettura del dataset lo ignora
+    """
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(percorso), exist_ok=True)
+    temporaneo = os.path.join(os.path.dirname(percorso), f".{os.path.basename(percorso)}.tmp")
+    pq.write_table(tabella, temporaneo, compression='zstd')
+    os.replace(temporaneo, percorso)
+    with _lock:
+        _cache_andamenti.clear()
+
+
+def elenco_snapshot(ranking):
+    """
+    Istanti (ordinati) degli snapshot disponibili per la lista, senza leggere i file
+    """
+    cartella = _cartella_lista(ranking)
+    if not os.path.isdir(cartella):
+        return []
+    return sorted(
+        nome.split('=', 1)[1] for nome in os.listdir(cartella)
+        if nome.startswith('snapshot=') and os.path.isfile(os.path.join(cartella, nome, 'dati.parquet'))
+    )
+
+
+def _firma_snapshot(ranking, istante):
+    import pyarrow.parquet as pq
+
+    metadati = pq.read_schema(percorso_snapshot(ranking, istante)).metadata or {}
+    return tuple(json.loads(metadati[_META_SORGENTE])) if _META_SORGENTE in metadati else None
+
+
+def salva_snapshot(ranking, df, firma=None, istante=None):
+    """
+    Salva uno snapshot della lista (solo le colonne utili allo storico) e ne restituisce l'istante
+    """
+    import pyarrow as pa
+
+    istante = istante or datetime.now(timezone.utc).strftime(FORMATO_ISTANTE)
+    colonne = [colonna for colonna in COLONNE_SNAPSHOT if colonna in df.columns]
+    dati = df[colonne].copy()
+    for colonna in ('Nome', 'Società', 'Sesso', 'Nazione'):
+        if colonna in dati.columns:
+            dati[colonna] = dati[colonna].astype(str)
+    for colonna in ('Categoria', 'Ranking', 'Punti'):
+        dati[colonna] = dati[colonna].astype('int32')
+
+    tabella = pa.Table.from_pandas(dati, preserve_index=False)
+    if firma is not None:
+        metadati = dict(tabella.schema.metadata or {})
+        metadati[_META_SORGENTE] = json.dumps(list(firma)).encode()
+        tabella = tabella.replace_schema_metadata(metadati)
+
+    # Prima gli aggregati: uno snapshot visibile ha sempre anche la sua serie per Società
+    _scrivi(pa.Table.from_pandas(aggrega_societa(dati), preserve_index=False),
+            percorso_snapshot(ranking, istante, CARTELLA_STORICO_SOCIETA))
+    _scrivi(tabella, percorso_snapshot(ranking, istante))
+    return istante
+
+
+def aggrega_societa(dati):
+    """
+    Aggregati per Società di uno snapshot (Punti Totali, Numero Atleti, Media Punti, Posizione)
+    """
+    aggregati = (
+        dati.groupby('Società', observed=True, sort=False)
+        .agg({'Punti': 'sum', 'Nome': 'count'})
+        .reset_index()
+        .rename(columns={'Nome': 'Numero Atleti', 'Punti': 'Punti Totali'})
+    )
+    aggregati['Media Punti'] = (aggregati['Punti Totali'] / aggregati['Numero Atleti']).round(2)
+    aggregati['Posizione'] = aggregati['Punti Totali'].rank(ascending=False, method='min').astype('int32')
+    aggregati['Punti Totali'] = aggregati['Punti Totali'].astype('int64')
+    aggregati['Numero Atleti'] = aggregati['Numero Atleti'].astype('int32')
+    return aggregati
+
+
+def _completa_aggregati(ranking):
+    """
+    Calcola gli aggregati per Società degli snapshot che ne sono privi (storico precedente)
+    """
+    import pyarrow as pa
+
+    for istante in elenco_snapshot(ranking):
+        percorso = percorso_snapshot(ranking, istante, CARTELLA_STORICO_SOCIETA)
+        if not os.path.isfile(percorso):
+            dati = carica_snapshot(ranking, istante, ['Nome', 'Società', 'Punti'])
+            _scrivi(pa.Table.from_pandas(aggrega_societa(dati), preserve_index=False), percorso)
+
+
+def aggiorna_storico(liste=None):
+    """
+    Salva uno snapshot delle liste caricate la cui versione non è ancora nello storico;
+    restituisce le liste per cui è stato creato un nuovo snapshot
+    """
+    nuove = []
+    for ranking in (liste or EXCEL_FILES):
+        _completa_aggregati(ranking)
+        firma = data_loader.firma_caricata(ranking, SHEET_NAME)
+        if firma is None:
+            continue
+        istanti = elenco_snapshot(ranking)
+        if istanti and _firma_snapshot(ranking, istanti[-1]) == firma:
+            continue
+        df = data_loader.carica_dati(EXCEL_FILES[ranking], sheet_name=SHEET_NAME)
+        salva_snapshot(ranking, df, firma)
+        nuove.append(ranking)
+    return nuove
+
+
+def carica_snapshot(ranking, istante, colonne=None):
+    """
+    Legge uno snapshot (eventualmente solo alcune colonne)
+    """
+    return pd.read_parquet(percorso_snapshot(ranking, istante), columns=colonne)
+
+
+# --- CONFRONTO TRA VERSIONI ---
+
+def _con_occorrenza(df):
+    """
+    Aggiunge il numero di occorrenza dell'identità, così omonimi nella stessa società
+    e categoria vengono abbinati uno a uno
+    """
+    df = df.copy()
+    df['_occorrenza'] = df.groupby(IDENTITA, sort=False).cumcount()
+    return df
+
+
+def confronta(prima, dopo):
+    """
+    Confronta due versioni di una lista abbinando gli atleti per Nome + Società + Categoria.
+    Restituisce una riga per atleta con posizioni e punti prima/dopo, le variazioni e lo Stato
+    (Nuovo, Uscito, Salito, Sceso, Stabile). 'Δ Posizioni' > 0 indica una risalita.
+    """
+    chiavi = IDENTITA + ['_occorrenza']
+    unione = pd.merge(
+        _con_occorrenza(prima)[chiavi + ['Ranking', 'Punti']],
+        _con_occorrenza(dopo)[chiavi + ['Ranking', 'Punti']],
+        on=chiavi, how='outer', suffixes=(' Prima', ' Dopo'), indicator=True
+    ).drop(columns='_occorrenza')
+
+    unione['Δ Posizioni'] = unione['Ranking Prima'] - unione['Ranking Dopo']
+    unione['Δ Punti'] = unione['Punti Dopo'] - unione['Punti Prima']
+    unione['Stato'] = np.select(
+        [
+            unione['_merge'] == 'right_only',
+            unione['_merge'] == 'left_only',
+            unione['Δ Posizioni'] > 0,
+            unione['Δ Posizioni'] < 0,
+        ],
+        ['Nuovo', 'Uscito', 'Salito', 'Sceso'],
+        default='Stabile'
+    )
+    unione['Stato'] = pd.Categorical(unione['Stato'], categories=STATI)
+    for colonna in ('Ranking Prima', 'Ranking Dopo', 'Punti Prima', 'Punti Dopo', 'Δ Posizioni', 'Δ Punti'):
+        unione[colonna] = unione[colonna].astype('Int32')
+    return unione.drop(columns='_merge')
+
+
+def movimenti(ranking, prima=None, dopo=None):
+    """
+    Confronto tra due snapshot della lista (di default gli ultimi due); None se non ce ne sono due.
+    Legge solo i due snapshot coinvolti e riusa i confronti già calcolati.
+    """
+    istanti = elenco_snapshot(ranking)
+    if len(istanti) < 2:
+        return None
+    dopo = dopo or istanti[-1]
+    prima = prima or istanti[istanti.index(dopo) - 1]
+    chiave = (ranking, prima, dopo)
+    with _lock:
+        trovato = chiave in _cache_confronti
+        if trovato:
+            _cache_confronti.move_to_end(chiave)
+            risultato = _cache_confronti[chiave]
+    conta_cache('confronti', trovato)
+    if trovato:
+        return risultato
+
+    colonne = IDENTITA + ['Ranking', 'Punti']
+    with fase('confronto_snapshot') as misura:
+        risultato = confronta(carica_snapshot(ranking, prima, colonne), carica_snapshot(ranking, dopo, colonne))
+        misura.righe = len(risultato)
+    with _lock:
+        _cache_confronti[chiave] = risultato
+        while len(_cache_confronti) > _CONFRONTI_IN_CACHE:
+            _cache_confronti.popitem(last=False)
+    return risultato
+
+
+# --- SERIE STORICHE ---
+
+def _interroga(radice, filtro, colonne, ranking=None):
+    """
+    Legge dal dataset partizionato (lista=/snapshot=) solo le colonne e le righe richieste:
+    il filtro sulla partizione esclude interi file, quello sulle colonne usa le statistiche Parquet
+    """
+    import pyarrow.dataset as ds
+
+    if not os.path.isdir(radice):
+        return None
+    dataset = ds.dataset(radice, format='parquet', partitioning='hive')
+    if ranking is not None:
+        filtro = filtro & (ds.field('lista') == ranking)
+    return dataset.to_table(columns=colonne + ['lista', 'snapshot'], filter=filtro).to_pandas()
+
+
+def _in_cache(chiave, calcola):
+    with _lock:
+        trovato = chiave in _cache_andamenti
+        if trovato:
+            _cache_andamenti.move_to_end(chiave)
+            risultato = _cache_andamenti[chiave]
+    conta_cache('andamenti', trovato)
+    if trovato:
+        return risultato
+    with fase(f"andamento_{chiave[0]}") as misura:
+        risultato = calcola()
+        misura.righe = len(risultato)
+    with _lock:
+        _cache_andamenti[chiave] = risultato
+        while len(_cache_andamenti) > _ANDAMENTI_IN_CACHE:
+            _cache_andamenti.popitem(last=False)
+    return risultato
+
+
+def _serie(df, colonne):
+    if df is None or df.empty:
+        return pd.DataFrame(columns=['lista', 'snapshot', 'Data'] + colonne)
+    df = df.sort_values(['lista', 'snapshot']).reset_index(drop=True)
+    df['Data'] = pd.to_datetime(df['snapshot'], format=FORMATO_ISTANTE)
+    return df[['lista', 'snapshot', 'Data'] + colonne]
+
+
+def andamento_atleta(nome, ranking=None, societa=None):
+    """
+    Punti e Ranking dell'atleta in ogni snapshot (una riga per lista e snapshot)
+    """
+    import pyarrow.dataset as ds
+
+    def calcola():
+        filtro = ds.field('Nome') == nome
+        if societa is not None:
+            filtro = filtro & (ds.field('Società') == societa)
+        colonne = ['Nome', 'Società', 'Categoria', 'Ranking', 'Punti']
+        return _serie(_interroga(CARTELLA_STORICO, filtro, colonne, ranking), colonne)
+
+    return _in_cache(('atleta', nome, ranking, societa), calcola)
+
+
+def andamento_societa(societa, ranking=None):
+    """
+    Serie pre-aggregata della Società: Punti Totali, Numero Atleti, Media Punti e Posizione per snapshot
+    """
+    import pyarrow.dataset as ds
+
+    def calcola():
+        colonne = ['Società', 'Punti Totali', 'Numero Atleti', 'Media Punti', 'Posizione']
+        df = _interroga(CARTELLA_STORICO_SOCIETA, ds.field('Società') == societa, colonne, ranking)
+        return _serie(df, colonne)
+
+    return _in_cache(('societa', societa, ranking), calcola)
+
+
+def formatta_istante(istante):
+    """
+    Istante di uno snapshot in formato leggibile (es. 01/03/2025 12:00)
+    """
+    try:
+        return datetime.strptime(istante, FORMATO_ISTANTE).strftime('%d/%m/%Y %H:%M')
+    except ValueError:
+        return istante
@@ -0,0 +1,117 @@
+# modules/watcher.py
+
+import logging
+import threading
+
+from config.settings import EXCEL_FILES, INTERVALLO_WATCHER, SHEET_NAME, WATCHER_ATTIVO
+from modules import data_loader
+from modules.business_logic import classifica_societa_dataset, indice_filtri
+from modules.storico import aggiorna_storico
+
+logger = logging.getLogger(__name__)
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def firma_su_disco(file_path):
+    """
+    Firma del file su disco, oppure None se il file non esiste
+    """
+    try:
+        return data_loader.firma_file(file_path)
+    except FileNotFoundError:
+        return None
+
+
+def prepara_dataset():
+    """
+    Precalcola dati combinati, indici dei filtri e classifica Società di tutte le viste,
+    così la prima richiesta dopo un aggiornamento non paga alcun calcolo
+    """
+    for liste in [None] + [[ranking] for ranking in EXCEL_FILES]:
+        df = data_loader.carica_tutte(liste, sheet_name=SHEET_NAME).dati
+        if not df.empty:
+            indice_filtri(df)
+            classifica_societa_dataset(df)
+
+
+class WatcherRankingList(threading.Thread):
+    """
+    Controlla periodicamente i file in EXCEL_FILES: un file aggiunto o sostituito viene riletto
+    solo quando la sua firma resta invariata tra due controlli (niente file scritti a metà),
+    un file rimosso viene tolto dalla memoria.
+    """
+
+    def __init__(self, intervallo=INTERVALLO_WATCHER):
+        super().__init__(name='watcher_ranking_list', daemon=True)
+        self.intervallo = intervallo
+        self._fermata = threading.Event()
+        # Ultima firma vista per ogni lista non ancora ricaricata
+        self._in_attesa = {}
+
+    def controlla(self):
+        """
+        Un giro di controllo; restituisce le liste ricaricate o rimosse
+        """
+        cambiate = []
+        for ranking, file_path in EXCEL_FILES.items():
+            firma = firma_su_disco(file_path)
+            if firma == data_loader.firma_caricata(ranking, SHEET_NAME):
+                self._in_attesa.pop(ranking, None)
+                continue
+            if firma is None:
+                data_loader.rimuovi_lista(ranking, SHEET_NAME)
+                logger.info("Ranking %s rimossa", ranking)
+                cambiate.append(ranking)
+                continue
+            if self._in_attesa.get(ranking) != firma:
+                # Primo avvistamento di questa versione: si aspetta che il file smetta di cambiare
+                self._in_attesa[ranking] = firma
+                continue
+            try:
+                data_loader.ricarica_lista(ranking, SHEET_NAME)
+            except Exception as errore:
+                logger.warning("Ranking %s non ricaricata, nuovo tentativo al prossimo controllo: %s", ranking, errore)
+                self._in_attesa.pop(ranking, None)
+                continue
+            self._in_attesa.pop(ranking, None)
+            logger.info("Ranking %s ricaricata", ranking)
+            cambiate.append(ranking)
+
+        if cambiate:
+            prepara_dataset()
+            aggiorna_storico(cambiate)
+        return cambiate
+
+    def run(self):
+        # Riscaldamento iniziale: le prime richieste trovano dati e indici già pronti
+        try:
+            prepara_dataset()
+            # Le versioni presenti all'avvio entrano nello storico se non ci sono già
+            aggiorna_storico()
+        except Exception:
+            logger.exception("Errore nel caricamento iniziale delle Ranking List")
+        while not self._fermata.wait(self.intervallo):
+            try:
+                self.controlla()
+            except Exception:
+                logger.exception("Errore nel watcher delle Ranking List")
+
+    def ferma(self):
+        self._fermata.set()
+
+
+def avvia_watcher():
+    """
+    Avvia (una sola volta per processo) il watcher delle Ranking List
+    """
+    global _watcher
+    if not WATCHER_ATTIVO:
+        return None
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = WatcherRankingList()
+            data_loader.attiva_aggiornamento_in_background()
+            _watcher.start()
+    return _watcher
@@ -0,0 +1,114 @@
+# views/components/cards.py
+import html
+
+import streamlit as st
+
+from modules.bandiere import data_uri_bandiera, normalizza_codice
+
+# --- STILE CSS DELLE CARD ---
+# Streamlit rimuove a ogni rerun gli elementi non ridisegnati, quindi lo stile
+# viaggia nello stesso elemento delle card: un solo delta per pagina.
+CSS_CARD = """<style>
+.classifica-container { display: flex; flex-direction: column; gap: 10px; padding: 10px; }
+.classifica-card {
+    display: flex; align-items: center; justify-content: space-between;
+    background-color: #1C1E2F; color: #F4F4F9; border-radius: 10px; padding: 15px;
+    box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2); transition: all 0.3s ease-in-out;
+    border: 1px solid transparent; cursor: pointer;
+}
+.classifica-card:hover { background-color: #2A2C3E; transform: scale(1.02); }
+.ranking { color: #FFD700; font-weight: bold; font-size: 1.5em; margin-right: 15px; }
+.flag-img {
+    display: inline-block; width: 35px; height: 24px; border-radius: 5px; margin-right: 15px;
+    background-size: cover; background-position: center;
+}
+.details { flex: 1; text-align: left; }
+.name { font-size: 1.2em; font-weight: bold; color: #F4F4F9; }
+.category { color: #A6A9B6; font-size: 0.9em; }
+.category strong { font-weight: bold; color: #FFD700; }
+.points { color: #FFD700; font-weight: bold; }
+</style>"""
+
+# Una card per riga, su una sola linea (il Markdown tratterebbe le righe indentate come codice)
+_CARD = (
+    "<div class='classifica-card'>"
+    "<div class='ranking'>#{posizione}</div>"
+    "<div class='flag'><span class='flag-img flag-{codice}' role='img' aria-label='{codice}'></span></div>"
+    "<div class='details'><span class='name'>{nome}</span><br>"
+    "<span class='category'>{dettaglio}</span></div>"
+    "<div class='points'>{punti} Punti</div>"
+    "</div>"
+)
+
+
+def url_bandiera(nazione):
+    """
+    Immagine della bandiera per il codice Nazione (data URI dalla mappa locale, nessuna CDN esterna)
+    """
+    return data_uri_bandiera(nazione)
+
+
+def css_bandiere(nazioni):
+    """
+    Regole CSS con le bandiere delle Nazioni indicate: ogni immagine viaggia una volta per pagina
+    """
+    codici = sorted({normalizza_codice(nazione) for nazione in nazioni})
+    regole = "".join(f".flag-{codice} {{ background-image: url('{url_bandiera(codice)}'); }}" for codice in codici)
+    return f"<style>{regole}</style>"
+
+
+def _colonna(df, nome, predefinito="N/A"):
+    return df[nome].tolist() if nome in df.columns else [predefinito] * len(df)
+
+
+def _card(posizioni, nazioni, nomi, dettagli, punti):
+    """
+    Genera l'HTML di tutte le card in un'unica passata sulle colonne
+    """
+    return css_bandiere(nazioni) + "".join(
+        _CARD.format(
+            posizione=posizione,
+            codice=normalizza_codice(nazione),
+            nome=html.escape(str(nome)),
+            dettaglio=dettaglio,
+            punti=punto,
+        )
+        for posizione, nazione, nome, dettaglio, punto in zip(posizioni, nazioni, nomi, dettagli, punti)
+    )
+
+
+def html_card_atleti(df):
+    """
+    HTML delle card della Classifica Generale (Ranking, Nome, Categoria, Società, Punti, Nazione)
+    """
+    dettagli = [
+        f"<strong>{html.escape(str(categoria))} kg</strong> - {html.escape(str(societa))}"
+        for categoria, societa in zip(df['Categoria'].tolist(), _colonna(df, 'Società'))
+    ]
+    if 'Liste' in df.columns:
+        # Viste combinate: posizione dell'atleta in ciascuna Ranking List
+        dettagli = [f"{dettaglio} | {html.escape(liste)}" for dettaglio, liste in zip(dettagli, df['Liste'].tolist())]
+    return _card(df['Ranking'].tolist(), df['Nazione'].tolist(), df['Nome'].tolist(), dettagli,
+                 df['Punti'].tolist())
+
+
+def html_card_societa(df):
+    """
+    HTML delle card della Classifica Società (Ranking, Società, Numero Atleti, Media Punti, Punti Totali)
+    """
+    dettagli = [
+        f"{numero} Atleti | Media punti per Atleta: {media}"
+        for numero, media in zip(df['Numero Atleti'].tolist(), df['Media Punti'].tolist())
+    ]
+    return _card(df['Ranking'].tolist(), df['Nazione'].tolist(), df['Società'].tolist(), dettagli,
+                 df['Punti Totali'].tolist())
+
+
+def mostra_card(html_card):
+    """
+    Mostra una pagina di card con un solo elemento Streamlit (stile incluso)
+    """
+    st.markdown(
+        f"{CSS_CARD}<div class='classifica-container'>{html_card}</div>",
+        unsafe_allow_html=True
+    )
@@ -0,0 +1,24 @@
+# views/components/esportazione.py
+from functools import partial
+
+import streamlit as st
+
+from modules.exporter import FORMATI, esporta_in_cache
+
+
+def pulsanti_esportazione(chiave, genera_df, nome_file):
+    """
+    Pulsanti di download della vista corrente (XLSX, CSV, Parquet).
+    Il file viene generato solo quando si clicca, e riusato se la stessa vista è già stata esportata.
+    """
+    colonne = st.columns(len(FORMATI))
+    for colonna, (formato, mime) in zip(colonne, FORMATI.items()):
+        with colonna:
+            st.download_button(
+                f"⬇️ {formato.upper()}",
+                data=partial(esporta_in_cache, chiave, genera_df, formato),
+                file_name=f"{nome_file}.{formato}",
+                mime=mime,
+                key=f"esporta_{nome_file}_{formato}",
+                on_click='ignore'
+            )
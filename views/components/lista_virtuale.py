@@ -0,0 +1,147 @@
+# views/components/lista_virtuale.py
+import json
+
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+from views.components.cards import CSS_CARD, url_bandiera
+
+# Altezza fissa di una card (px): serve al browser per sapere quali righe sono visibili
+ALTEZZA_RIGA = 88
+
+
+def _codifica(serie):
+    """
+    Codifica una colonna come (codici, dizionario): i valori ripetuti viaggiano una sola volta
+    """
+    codici, valori = pd.factorize(serie, sort=False)
+    return codici.tolist(), [str(valore) for valore in valori]
+
+
+def _payload(ranking, nazioni, nomi, dettagli_a, dettagli_b, punti, formato):
+    codici_nazione, nazioni_distinte = _codifica(nazioni)
+    codici_a, valori_a = _codifica(dettagli_a)
+    codici_b, valori_b = _codifica(dettagli_b)
+    return {
+        'formato': formato,
+        'ranking': pd.Series(ranking).tolist(),
+        'nome': pd.Series(nomi).astype(str).tolist(),
+        'punti': pd.Series(punti).tolist(),
+        'nazione': codici_nazione,
+        'bandiere': [url_bandiera(nazione) for nazione in nazioni_distinte],
+        'a': codici_a, 'valori_a': valori_a,
+        'b': codici_b, 'valori_b': valori_b,
+    }
+
+
+def payload_atleti(df):
+    """
+    Dati compatti della Classifica Generale da inviare al browser (solo le colonne mostrate)
+    """
+    societa = df['Società'] if 'Società' in df.columns else pd.Series(['N/A'] * len(df))
+    return _payload(df['Ranking'], df['Nazione'], df['Nome'], df['Categoria'], societa, df['Punti'], 'atleti')
+
+
+def payload_societa(df):
+    """
+    Dati compatti della Classifica Società da inviare al browser
+    """
+    return _payload(df['Ranking'], df['Nazione'], df['Società'], df['Numero Atleti'], df['Media Punti'],
+                    df['Punti Totali'], 'societa')
+
+
+_SCRIPT = """
+<script>
+const dati = __DATI__;
+const altezza = __ALTEZZA__;
+const contenitore = document.getElementById('lista');
+const spaziatore = document.getElementById('spaziatore');
+const finestra = document.getElementById('finestra');
+spaziatore.style.height = (dati.nome.length * altezza) + 'px';
+
+function span(classe, testo) {
+    const el = document.createElement('span');
+    el.className = classe;
+    el.textContent = testo;
+    return el;
+}
+
+function card(i) {
+    const div = document.createElement('div');
+    div.className = 'classifica-card';
+    div.style.height = (altezza - 20) + 'px';
+    const ranking = document.createElement('div');
+    ranking.className = 'ranking';
+    ranking.textContent = '#' + dati.ranking[i];
+    const bandiera = document.createElement('div');
+    bandiera.className = 'flag';
+    const img = document.createElement('span');
+    img.className = 'flag-img';
+    img.style.backgroundImage = "url('" + dati.bandiere[dati.nazione[i]] + "')";
+    bandiera.appendChild(img);
+    const dettagli = document.createElement('div');
+    dettagli.className = 'details';
+    dettagli.appendChild(span('name', dati.nome[i]));
+    dettagli.appendChild(document.createElement('br'));
+    const a = dati.valori_a[dati.a[i]], b = dati.valori_b[dati.b[i]];
+    if (dati.formato === 'atleti') {
+        const categoria = span('category', ' - ' + b);
+        const forte = document.createElement('strong');
+        forte.textContent = a + ' kg';
+        categoria.prepend(forte);
+        dettagli.appendChild(categoria);
+    } else {
+        dettagli.appendChild(span('category', a + ' Atleti | Media punti per Atleta: ' + b));
+    }
+    const punti = document.createElement('div');
+    punti.className = 'points';
+    punti.textContent = dati.punti[i] + ' Punti';
+    div.append(ranking, bandiera, dettagli, punti);
+    return div;
+}
+
+// Disegna solo le card visibili (più un margine), riusando lo scroll nativo del contenitore
+let primaDisegnata = -1;
+function disegna() {
+    const prima = Math.max(0, Math.floor(contenitore.scrollTop / altezza) - 5);
+    if (prima === primaDisegnata) return;
+    primaDisegnata = prima;
+    const ultima = Math.min(dati.nome.length, prima + Math.ceil(contenitore.clientHeight / altezza) + 10);
+    const frammento = document.createDocumentFragment();
+    for (let i = prima; i < ultima; i++) frammento.appendChild(card(i));
+    finestra.replaceChildren(frammento);
+    finestra.style.transform = 'translateY(' + (prima * altezza) + 'px)';
+}
+contenitore.addEventListener('scroll', () => requestAnimationFrame(disegna));
+disegna();
+</script>
+"""
+
+
+def mostra_lista_virtuale(payload, altezza=700):
+    """
+    Mostra l'intero risultato in una lista a scorrimento virtualizzata lato browser:
+    i dati vengono inviati una volta sola e lo scorrimento non richiede rerun.
+    """
+    if not payload['nome']:
+        return
+    dati = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).replace('</', '<\\/')
+    script = _SCRIPT.replace('__DATI__', dati).replace('__ALTEZZA__', str(ALTEZZA_RIGA))
+    pagina = f"""
+        {CSS_CARD}
+        <style>
+            body {{ margin: 0; background-color: transparent; font-family: 'Arial', sans-serif; }}
+            #lista {{ height: {altezza}px; overflow-y: auto; position: relative; }}
+            #finestra {{ position: absolute; top: 0; left: 0; right: 0; }}
+            .classifica-card {{ box-sizing: border-box; margin: 10px; }}
+            .classifica-card:hover {{ transform: none; }}
+        </style>
+        <div id='lista'><div id='spaziatore'></div><div id='finestra'></div></div>
+        {script}
+    """
+    # st.iframe sostituisce components.html nelle versioni recenti di Streamlit
+    if hasattr(st, 'iframe'):
+        st.iframe(pagina, height=altezza + 10)
+    else:
+        components.html(pagina, height=altezza + 10)
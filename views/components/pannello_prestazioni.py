@@ -0,0 +1,46 @@
+# views/components/pannello_prestazioni.py
+import pandas as pd
+import streamlit as st
+
+from modules import metriche
+from modules.cache_risultati import risultati
+
+
+def mostra_pannello():
+    """
+    Pannello delle prestazioni (nascosto, aperto con ?prestazioni=1): fasi dell'ultimo rerun,
+    totali del processo, cache e metriche in formato Prometheus
+    """
+    st.divider()
+    st.markdown("### ⏱️ Prestazioni")
+    st.caption(f"Memoria residente del processo: {metriche.memoria_rss() / 2 ** 20:.0f} MB")
+
+    traccia = metriche.traccia()
+    if traccia:
+        st.markdown("**Questo rerun**")
+        df = pd.DataFrame(traccia)
+        st.caption(f"Totale misurato: {df['ms'].sum():.1f} ms")
+        st.dataframe(df.round(2), width='stretch')
+
+    fasi, cache = metriche.riepilogo()
+    if fasi:
+        st.markdown("**Fasi (dall'avvio del processo)**")
+        st.dataframe(pd.DataFrame(fasi).sort_values('ms_totali', ascending=False).round(2), width='stretch')
+    if cache:
+        st.markdown("**Cache**")
+        st.dataframe(pd.DataFrame(cache).round(3), width='stretch')
+
+    # La cache dei risultati conta hit, miss ed espulsioni anche con le metriche disattivate
+    statistiche = risultati.statistiche()
+    st.markdown("**Cache dei risultati (condivisa tra le sessioni)**")
+    colonne = st.columns(4)
+    colonne[0].metric("Voci", statistiche['voci'])
+    colonne[1].metric("Hit rate", f"{statistiche['hit_rate']:.1%}")
+    colonne[2].metric("Espulsioni", statistiche['espulsioni'])
+    colonne[3].metric("Memoria", f"{statistiche['byte'] / 2 ** 20:.1f} MB")
+
+    with st.expander("Formato Prometheus"):
+        st.code(metriche.testo_prometheus() + risultati.testo_prometheus(), language='text')
+    if st.button("🧹 Azzera metriche", key="azzera_metriche"):
+        metriche.azzera()
+        st.rerun()
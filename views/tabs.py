@@ -1,12 +1,89 @@
 import streamlit as st
-import pandas as pd
-from modules.data_loader import carica_dati
-from config.settings import EXCEL_FILES, SHEET_NAME
-from io import BytesIO
-from pathlib import Path
+import numpy as np
+from modules.data_loader import COLONNA_LISTA, carica_tutte
+from modules.business_logic import (
+    chiave_vista, indice_filtri, indice_ricerca, ordinate_in_cache, ordine_del_file, ordine_per_colonna,
+    posizioni_in_cache
+)
+from modules.cache_risultati import risultati
+from modules.classifica_unificata import VISTE, classifica_unificata, ordine_unificato, pagina_unificata, scelta_in_cache
+from modules.metriche import fase
+from modules import prefetch
+from config.settings import EXCEL_FILES, RICERCA_TOLLERANTE, RISULTATI_PER_PAGINA, SHEET_NAME
+from views.components.cards import html_card_atleti, mostra_card
+from views.components.esportazione import pulsanti_esportazione
+from views.components.lista_virtuale import mostra_lista_virtuale, payload_atleti
+from uuid import uuid4
+
+# Vista con "Tutte": ogni riga di ogni lista, senza accorpare gli atleti
+VISTA_RIGHE = 'Tutte le righe'
+# Righe mostrate prima e dopo l'atleta cercato con "Vai all'atleta"
+RAGGIO_ATLETA = 5
+# Massimo numero di atleti proposti dalla ricerca di "Vai all'atleta"
+MAX_ATLETI_PROPOSTI = 50
+
+def vai_atleta(df, posizioni, ordinamento):
+    """
+    Cerca un atleta tra i risultati filtrati, mostra la sua posizione con ±RAGGIO_ATLETA righe
+    e permette di saltare alla sua pagina
+    """
+    cerca = st.text_input("🎯 Vai all'atleta", key="vai_atleta_generale")
+    if not cerca:
+        return
+    righe = indice_ricerca(df, 'Nome').righe(cerca, RICERCA_TOLLERANTE)
+    # Una query fatta solo di punteggiatura si normalizza a vuota: nessun atleta da cercare
+    if righe is not None and posizioni is not None:
+        righe = np.intersect1d(righe, posizioni, assume_unique=True)
+    if righe is None or len(righe) == 0:
+        st.info("Nessun atleta trovato tra i risultati filtrati.")
+        return
+
+    def dettaglio(riga):
+        colonne = [colonna for colonna in ('Nome', 'Categoria', 'Società', COLONNA_LISTA) if colonna in df.columns]
+        return " - ".join(str(df[colonna].iat[riga]) for colonna in colonne)
+
+    riga = st.selectbox('🥋 Atleta', righe[:MAX_ATLETI_PROPOSTI].tolist(), format_func=dettaglio,
+                        key="atleta_scelto_generale")
+    finestra, _ = ordinamento.intorno(riga, RAGGIO_ATLETA, posizioni)
+    indice = ordinamento.indice_di(riga, posizioni)
+    st.caption(f"Posizione {indice + 1} di {ordinamento.totale(posizioni)} nella vista corrente")
+    mostra_card(html_card_atleti(df.take(finestra)))
+    if st.button("📍 Vai alla sua pagina", key="vai_pagina_atleta"):
+        st.session_state.pagina_corrente_generale = indice // RISULTATI_PER_PAGINA + 1
+        st.rerun()
+
+def prefetch_vicine(df, versione, ranking_file, sesso, categoria, categorie, ricerca_nome, societa, vista,
+                    nome_ordine, ordinamento, chiave, posizioni, inizio):
+    """
+    Dopo aver servito la pagina, prepara in background nella cache condivisa le viste probabili successive:
+    pagina precedente e successiva, poi le altre Categorie dello stesso Sesso (le più vicine per prime)
+    """
+    lavori = []
+    if vista != VISTA_RIGHE:
+        # Con le viste per righe ogni pagina è già una fetta dell'ordine in cache
+        for vicina in (inizio + RISULTATI_PER_PAGINA, inizio - RISULTATI_PER_PAGINA):
+            if vicina >= 0:
+                lavori.append(lambda vicina=vicina: scelta_in_cache(
+                    chiave, df, vista, posizioni, vicina, vicina + RISULTATI_PER_PAGINA))
+
+    corrente = categorie.index(categoria) if categoria in categorie else 0
+    vicine = sorted((c for c in range(len(categorie)) if c != corrente), key=lambda c: abs(c - corrente))
+
+    def prepara_categoria(altra):
+        chiave_altra = chiave_vista(versione, ranking_file, sesso, altra, ricerca_nome=ricerca_nome)
+        posizioni_altra = posizioni_in_cache(chiave_altra, df, sesso, altra, ricerca_nome)
+        if societa != 'Tutte':
+            chiave_altra = chiave_vista(versione, ranking_file, sesso, altra, societa, ricerca_nome)
+            posizioni_altra = posizioni_in_cache(chiave_altra, df, sesso, altra, ricerca_nome, societa)
+        if vista != VISTA_RIGHE:
+            scelta_in_cache(chiave_altra, df, vista, posizioni_altra, 0, RISULTATI_PER_PAGINA)
+        else:
+            ordinate_in_cache(chiave_altra, nome_ordine, ordinamento, posizioni_altra)
 
-# Costante per il numero di risultati per pagina
-RISULTATI_PER_PAGINA = 10
+    lavori += [lambda altra=categorie[c]: prepara_categoria(altra) for c in vicine]
+    # Un solo gruppo di lavori per sessione: quello della vista precedente viene annullato
+    sessione = st.session_state.setdefault('sessione_prefetch', uuid4().hex)
+    prefetch.programma(sessione, lavori)
 
 def classifica_generale():
     st.markdown("### 🏆 Classifica Generale")
@@ -20,25 +97,13 @@ def classifica_generale():
         key="ranking_generale"
     )
 
-    # Caricamento dati con gestione errori per file mancanti
-    df = pd.DataFrame()
-    if ranking_file == 'Tutte':
-        dfs = []
-        for file in EXCEL_FILES.keys():
-            file_path = Path(EXCEL_FILES[file])
-            if not file_path.is_file():
-                st.warning(f"⚠️ Ranking {file} non presente.")
-                continue
-            df_temp = carica_dati(file_path, sheet_name=SHEET_NAME)
-            dfs.append(df_temp)
-        if dfs:
-            df = pd.concat(dfs, ignore_index=True)
-    else:
-        file_path = Path(EXCEL_FILES[ranking_file])
-        if not file_path.is_file():
-            st.warning(f"⚠️ Ranking {ranking_file} non presente.")
-        else:
-            df = carica_dati(file_path, sheet_name=SHEET_NAME)
+    # Caricamento dati (in parallelo per "Tutte") con gestione dei file mancanti
+    liste = None if ranking_file == 'Tutte' else [ranking_file]
+    risultato = carica_tutte(liste, sheet_name=SHEET_NAME)
+    if risultato.mancanti:
+        elenco = ", ".join(mancante.ranking for mancante in risultato.mancanti)
+        st.warning(f"⚠️ Ranking {elenco} non presente.")
+    df = risultato.dati
 
     if df.empty:
         st.info("Nessun dato disponibile.")
@@ -52,19 +117,11 @@ def classifica_generale():
         on_change=lambda: st.session_state.update({"reset_pagina_generale": True})
     )
 
-    # Filtra in base al sesso selezionato
-    if sesso == 'Maschi':
-        df = df[df['Sesso'] == 'M']
-    elif sesso == 'Femmine':
-        df = df[df['Sesso'] == 'F']
+    # Indice dei filtri, costruito una sola volta per il dataset caricato
+    indice = indice_filtri(df)
 
     # --- FILTRO CATEGORIA (SINCRONIZZATO CON SESSO) ---
-    if sesso == 'Maschi':
-        categorie = ['Tutte'] + sorted(df[df['Sesso'] == 'M']['Categoria'].unique().tolist())
-    elif sesso == 'Femmine':
-        categorie = ['Tutte'] + sorted(df[df['Sesso'] == 'F']['Categoria'].unique().tolist())
-    else:
-        categorie = ['Tutte'] + sorted(df['Categoria'].unique().tolist())
+    categorie = ['Tutte'] + indice.opzioni_categoria(sesso)
 
     categoria = st.selectbox(
         '📂 Seleziona Categoria', 
@@ -72,8 +129,6 @@ def classifica_generale():
         key="categoria_generale",
         on_change=lambda: st.session_state.update({"reset_pagina_generale": True})
     )
-    if categoria != 'Tutte':
-        df = df[df['Categoria'] == categoria]
 
     # --- FILTRO RICERCA ATLETA (TERZA SCELTA) ---
     ricerca_nome = st.text_input(
@@ -81,12 +136,15 @@ def classifica_generale():
         key="ricerca_atleta", 
         on_change=lambda: st.session_state.update({"reset_pagina_generale": True})
     )
-    if ricerca_nome:
-        df = df[df['Nome'].str.contains(ricerca_nome, case=False, na=False)]
+    # Filtri e ordinamenti risolti nella cache condivisa: la stessa vista si calcola una volta per tutti
+    chiave = chiave_vista(risultato.versione, ranking_file, sesso, categoria, ricerca_nome=ricerca_nome)
+    posizioni = posizioni_in_cache(chiave, df, sesso, categoria, ricerca_nome)
 
     # --- FILTRO SOCIETÀ (ULTIMA SCELTA) ---
+    societa = 'Tutte'
+    ordina_per_ranking = False
     if 'Società' in df.columns:
-        societa_options = ['Tutte'] + sorted(df['Società'].unique().tolist())
+        societa_options = ['Tutte'] + indice.opzioni_societa(posizioni)
         societa = st.selectbox(
             '🏢 Seleziona Società',
             societa_options,
@@ -94,11 +152,62 @@ def classifica_generale():
             on_change=lambda: st.session_state.update({"reset_pagina_generale": True})
         )
         if societa != 'Tutte':
-            df = df[df['Società'] == societa]
-            df = df.sort_values(by='Ranking', ascending=True)
+            chiave = chiave_vista(risultato.versione, ranking_file, sesso, categoria, societa, ricerca_nome)
+            posizioni = posizioni_in_cache(chiave, df, sesso, categoria, ricerca_nome, societa)
+            ordina_per_ranking = True
     else:
         st.warning("❗ La colonna 'Società' non è presente in questa Ranking List.")
 
+    # --- VISTA COMBINATA (SOLO CON "TUTTE") ---
+    # Le liste vengono fuse in ordine di Ranking; un atleta presente in più liste può essere accorpato
+    vista = VISTA_RIGHE
+    if ranking_file == 'Tutte' and COLONNA_LISTA in df.columns:
+        vista = st.radio(
+            '🔗 Vista',
+            [VISTA_RIGHE] + list(VISTE),
+            horizontal=True,
+            key="vista_generale",
+            on_change=lambda: st.session_state.update({"reset_pagina_generale": True})
+        )
+
+    # Ordine delle righe calcolato una volta per dataset: ogni pagina seleziona solo le sue righe
+    nome_ordine, ordinamento = None, None
+    if vista != VISTA_RIGHE:
+        unificata = classifica_unificata(df)
+        totale_risultati = risultati.ottieni(chiave + ('atleti',), lambda: unificata.totale_atleti(posizioni))
+
+        def pagina_vista(inizio, fine):
+            return pagina_unificata(chiave, df, vista, posizioni, inizio, fine)
+    else:
+        if ranking_file == 'Tutte' and COLONNA_LISTA in df.columns:
+            nome_ordine, ordinamento = 'unificato', ordine_unificato(df)
+        elif ordina_per_ranking:
+            nome_ordine, ordinamento = 'Ranking', ordine_per_colonna(df, 'Ranking')
+        else:
+            nome_ordine, ordinamento = 'file', ordine_del_file(df)
+        ordinate = ordinate_in_cache(chiave, nome_ordine, ordinamento, posizioni)
+        totale_risultati = len(ordinate)
+
+        def pagina_vista(inizio, fine):
+            return df.take(ordinate[inizio:fine])
+
+    # --- ESPORTAZIONE (GENERATA SOLO AL DOWNLOAD) ---
+    pulsanti_esportazione(
+        (risultato.versione, ranking_file, sesso, categoria, ricerca_nome, societa, vista),
+        lambda: pagina_vista(0, None),
+        "classifica_generale"
+    )
+
+    # --- SCORRIMENTO CONTINUO (PAGINAZIONE LATO BROWSER) ---
+    if st.toggle('📜 Scorrimento continuo', key="scorrimento_generale"):
+        st.caption(f"{totale_risultati} atleti")
+        mostra_lista_virtuale(payload_atleti(pagina_vista(0, None)))
+        return
+
+    # --- VAI ALL'ATLETA (POSIZIONE ±5 NELLA VISTA CORRENTE) ---
+    if ordinamento is not None:
+        vai_atleta(df, posizioni, ordinamento)
+
     # --- RESET PAGINAZIONE ---
     if 'reset_pagina_generale' not in st.session_state:
         st.session_state.reset_pagina_generale = False
@@ -110,8 +219,7 @@ def classifica_generale():
     if 'pagina_corrente_generale' not in st.session_state:
         st.session_state.pagina_corrente_generale = 1
 
-    # Numero totale di risultati e pagine
-    totale_risultati = len(df)
+    # Numero totale di pagine
     totale_pagine = (totale_risultati - 1) // RISULTATI_PER_PAGINA + 1
     
     # Limita la pagina corrente ai limiti disponibili
@@ -121,96 +229,15 @@ def classifica_generale():
     # Selezione dei risultati per la pagina corrente
     inizio = (pagina_corrente - 1) * RISULTATI_PER_PAGINA
     fine = inizio + RISULTATI_PER_PAGINA
-    df_paginato = df.iloc[inizio:fine]
-
-    # --- STILE CSS ---
-    st.markdown("""
-        <style>
-            .classifica-container {
-                display: flex;
-                flex-direction: column;
-                gap: 10px;
-                padding: 10px;
-            }
-            .classifica-card {
-                display: flex;
-                align-items: center;
-                justify-content: space-between;
-                background-color: #1C1E2F;
-                color: #F4F4F9;
-                border-radius: 10px;
-                padding: 15px;
-                box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2);
-                transition: all 0.3s ease-in-out;
-                border: 1px solid transparent;
-                cursor: pointer;
-            }
-            .classifica-card:hover {
-                background-color: #2A2C3E;
-                transform: scale(1.02);
-            }
-            .ranking {
-                color: #FFD700;
-                font-weight: bold;
-                font-size: 1.5em;
-                margin-right: 15px;
-            }
-            .flag img {
-                width: 35px;
-                border-radius: 5px;
-                margin-right: 15px;
-            }
-            .details {
-                flex: 1;
-                text-align: left;
-            }
-            .name {
-                font-size: 1.2em;
-                font-weight: bold;
-                color: #F4F4F9;
-            }
-            .category {
-                color: #A6A9B6;
-                font-size: 0.9em;
-            }
-            .category strong {
-                font-weight: bold;
-                color: #FFD700;
-            }
-            .points {
-                color: #FFD700;
-                font-weight: bold;
-            }
-        </style>
-    """, unsafe_allow_html=True)
+    df_paginato = pagina_vista(inizio, fine)
 
     # --- VISUALIZZAZIONE CLASSIFICA ---
-    st.markdown("<div class='classifica-container'>", unsafe_allow_html=True)
-    for _, row in df_paginato.iterrows():
-        posizione = f"#{row['Ranking']}"
-        nome = row['Nome']
-        categoria = row['Categoria']
-        societa = row['Società'] if 'Società' in row else "N/A"
-        punti = row['Punti']
-        nazione = row['Nazione'].lower()
-        flag_url = f"https://flagcdn.com/w40/{nazione}.png"
-
-        st.markdown(f"""
-            <div class='classifica-card'>
-                <div class='ranking'>{posizione}</div>
-                <div class='flag'>
-                    <img src='{flag_url}' alt='flag'>
-                </div>
-                <div class='details'>
-                    <span class='name'>{nome}</span><br>
-                    <span class='category'><strong>{categoria} kg</strong> - {societa}</span>
-                </div>
-                <div class='points'>
-                    {punti} Punti
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
+    with fase('generale_card', righe=len(df_paginato)):
+        mostra_card(html_card_atleti(df_paginato))
+
+    # --- PREFETCH DELLE VISTE VICINE (IN BACKGROUND) ---
+    prefetch_vicine(df, risultato.versione, ranking_file, sesso, categoria, categorie, ricerca_nome, societa, vista,
+                    nome_ordine, ordinamento, chiave, posizioni, inizio)
 
 # --- NAVIGAZIONE PAGINAZIONE ---
     col1, col2, col3 = st.columns([1, 2, 1])
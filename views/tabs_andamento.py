@@ -0,0 +1,86 @@
+import streamlit as st
+import plotly.express as px
+from modules.data_loader import carica_tutte
+from modules.business_logic import indice_ricerca
+from modules.storico import andamento_atleta, andamento_societa
+from config.settings import EXCEL_FILES, RICERCA_TOLLERANTE, SHEET_NAME
+
+# Massimo numero di nomi proposti dopo una ricerca
+MAX_SUGGERIMENTI = 50
+
+def _grafico(serie, y, titolo, inverti=False):
+    """
+    Grafico a linee della serie storica (una linea per Ranking List)
+    """
+    fig = px.line(serie, x='Data', y=y, color='Serie', markers=True, title=titolo)
+    if inverti:
+        # Per la posizione in classifica il valore migliore (1) sta in alto
+        fig.update_yaxes(autorange='reversed')
+    st.plotly_chart(fig, width='stretch')
+
+
+def andamento():
+    st.markdown("### 📊 Andamento")
+    st.divider()
+
+    # Selettore di Ranking List con l'aggiunta di "Tutte"
+    ranking_options = ['Tutte'] + list(EXCEL_FILES.keys())
+    ranking_file = st.selectbox(
+        '🏆 Seleziona una Ranking List',
+        ranking_options,
+        key="ranking_andamento"
+    )
+    ranking = None if ranking_file == 'Tutte' else ranking_file
+
+    # I nomi proposti vengono dalle liste attuali; la serie arriva dallo storico
+    df = carica_tutte(None if ranking is None else [ranking], sheet_name=SHEET_NAME).dati
+    if df.empty:
+        st.info("Nessun dato disponibile.")
+        return
+
+    tipo = st.radio('📌 Andamento di', ['Atleta', 'Società'], horizontal=True, key="tipo_andamento")
+
+    if tipo == 'Atleta':
+        ricerca = st.text_input('🔍 Cerca Atleta', key="ricerca_andamento")
+        trovati = indice_ricerca(df, 'Nome').valori_trovati(ricerca, RICERCA_TOLLERANTE)
+        if not trovati:
+            st.info("Cerca un atleta per vederne l'andamento.")
+            return
+        nome = st.selectbox('🥋 Atleta', trovati[:MAX_SUGGERIMENTI], key="atleta_andamento")
+
+        serie = andamento_atleta(nome, ranking)
+        if serie.empty:
+            st.info("Nessuno snapshot disponibile per questo atleta.")
+            return
+        # Omonimi di Società diverse restano su linee separate
+        serie = serie.assign(Serie=serie['lista'] + ' - ' + serie['Società'])
+        _grafico(serie, 'Punti', f"Punti di {nome}")
+        _grafico(serie, 'Ranking', f"Posizione di {nome}", inverti=True)
+        st.dataframe(
+            serie[['Data', 'lista', 'Società', 'Categoria', 'Ranking', 'Punti']].reset_index(drop=True),
+            width='stretch'
+        )
+    else:
+        if 'Società' not in df.columns:
+            st.warning("❗ La colonna 'Società' non è presente in questa Ranking List.")
+            return
+        ricerca = st.text_input('🔍 Cerca Società', key="ricerca_societa_andamento")
+        trovate = indice_ricerca(df, 'Società').valori_trovati(ricerca, RICERCA_TOLLERANTE)
+        if trovate is None:
+            trovate = sorted(df['Società'].dropna().unique().tolist())
+        if not trovate:
+            st.info("Nessuna società trovata.")
+            return
+        societa = st.selectbox('🏢 Società', trovate[:MAX_SUGGERIMENTI], key="societa_andamento")
+
+        serie = andamento_societa(societa, ranking)
+        if serie.empty:
+            st.info("Nessuno snapshot disponibile per questa società.")
+            return
+        serie = serie.assign(Serie=serie['lista'])
+        _grafico(serie, 'Punti Totali', f"Punti Totali di {societa}")
+        _grafico(serie, 'Posizione', f"Posizione di {societa}", inverti=True)
+        st.dataframe(
+            serie[['Data', 'lista', 'Numero Atleti', 'Media Punti', 'Punti Totali', 'Posizione']].reset_index(drop=True),
+            width='stretch'
+        )
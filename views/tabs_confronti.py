@@ -0,0 +1,80 @@
+import streamlit as st
+import plotly.express as px
+from modules.data_loader import COLONNA_LISTA, carica_tutte
+from modules.business_logic import cubo_statistiche
+from config.settings import SHEET_NAME
+
+# Dimensioni per cui si può suddividere il confronto
+SUDDIVISIONI = {
+    'Società': 'Società',
+    'Categoria': 'Categoria',
+    'Ranking List': COLONNA_LISTA,
+    'Sesso': 'Sesso',
+    'Nazione': 'Nazione',
+}
+# Barre mostrate al massimo nei grafici (le voci con più Punti Totali); la tabella le riporta tutte
+MAX_BARRE = 20
+
+def _grafico(tabella, x, y, titolo, colore=None):
+    """
+    Grafico a barre di una misura del cubo (le Categorie sono etichette, non valori continui)
+    """
+    tabella = tabella.head(MAX_BARRE).astype({x: str})
+    if colore is not None:
+        tabella = tabella.astype({colore: str})
+    fig = px.bar(tabella, x=x, y=y, color=colore or x, title=titolo, text_auto=True, barmode='group')
+    st.plotly_chart(fig, width='stretch')
+
+
+def confronti():
+    st.markdown("### 🔍 Confronti")
+    st.divider()
+
+    # Tutte le liste in un solo cubo: la Ranking List è una delle dimensioni del confronto
+    risultato = carica_tutte(sheet_name=SHEET_NAME)
+    if risultato.mancanti:
+        elenco = ", ".join(mancante.ranking for mancante in risultato.mancanti)
+        st.warning(f"⚠️ Ranking {elenco} non presente.")
+    df = risultato.dati
+    if df.empty:
+        st.info("Nessun dato disponibile.")
+        return
+    cubo = cubo_statistiche(df)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        liste = st.multiselect('🏆 Ranking List', cubo.valori_presenti(COLONNA_LISTA), key="liste_confronti")
+    with col2:
+        sesso = st.selectbox('👫 Seleziona Sesso', ['Tutti', 'Maschi', 'Femmine'], key="sesso_confronti")
+    base = {COLONNA_LISTA: liste, 'Sesso': sesso}
+
+    societa = st.multiselect('🏢 Seleziona Società', cubo.valori_presenti('Società', base), key="societa_confronti")
+    categorie = st.multiselect('🏷️ Seleziona Categorie', cubo.valori_presenti('Categoria', base),
+                               key="categorie_confronti")
+    filtri = {**base, 'Società': societa, 'Categoria': categorie}
+
+    # --- TOTALI DELLA SELEZIONE ---
+    totale = cubo.interroga(filtri=filtri).iloc[0]
+    if not totale['Numero Atleti']:
+        st.info("Nessun atleta per i filtri selezionati.")
+        return
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Atleti", int(totale['Numero Atleti']))
+    col2.metric("Punti Totali", int(totale['Punti Totali']))
+    col3.metric("Media Punti", f"{totale['Media Punti']:.2f}")
+    col4.metric("Punti Massimi", int(totale['Punti Massimi']))
+
+    # --- CONFRONTO PER LA DIMENSIONE SCELTA ---
+    scelta = st.radio('📊 Confronta per', list(SUDDIVISIONI), horizontal=True, key="suddivisione_confronti")
+    dimensione = SUDDIVISIONI[scelta]
+    # Con più liste scelte ogni barra si divide per lista
+    per_lista = len(liste) > 1 and dimensione != COLONNA_LISTA
+    per = [dimensione, COLONNA_LISTA] if per_lista else [dimensione]
+    tabella = cubo.interroga(per, filtri, ordina='Punti Totali')
+    colore = COLONNA_LISTA if per_lista else None
+
+    _grafico(tabella, dimensione, 'Punti Totali', f'Punti Totali per {scelta}', colore)
+    _grafico(tabella, dimensione, 'Media Punti', f'Media Punti per {scelta}', colore)
+    if len(tabella) > MAX_BARRE:
+        st.caption(f"Nei grafici le prime {MAX_BARRE} voci su {len(tabella)} per Punti Totali.")
+    st.dataframe(tabella, width='stretch', hide_index=True)
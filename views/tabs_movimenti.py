@@ -0,0 +1,64 @@
+import streamlit as st
+from modules.storico import STATI, elenco_snapshot, formatta_istante, movimenti
+from config.settings import EXCEL_FILES
+
+# Colonne mostrate nella tabella dei movimenti
+COLONNE_MOVIMENTI = [
+    'Stato', 'Nome', 'Società', 'Categoria', 'Ranking Prima', 'Ranking Dopo',
+    'Δ Posizioni', 'Punti Prima', 'Punti Dopo', 'Δ Punti'
+]
+
+def movimenti_ranking():
+    st.markdown("### 📈 Movimenti")
+    st.divider()
+
+    ranking_file = st.selectbox(
+        '🏆 Seleziona una Ranking List',
+        list(EXCEL_FILES.keys()),
+        key="ranking_movimenti"
+    )
+
+    istanti = elenco_snapshot(ranking_file)
+    if len(istanti) < 2:
+        st.info("Servono almeno due versioni della Ranking List per mostrare i movimenti.")
+        return
+
+    # --- VERSIONI DA CONFRONTARE (DI DEFAULT LE ULTIME DUE) ---
+    # Chiavi per lista (e per versione precedente): una scelta fatta su un'altra lista non resta selezionata
+    col1, col2 = st.columns(2)
+    with col1:
+        prima = st.selectbox(
+            '🕒 Versione precedente',
+            istanti[:-1],
+            index=len(istanti) - 2,
+            format_func=formatta_istante,
+            key=f"prima_movimenti_{ranking_file}"
+        )
+    with col2:
+        successive = [istante for istante in istanti if istante > prima]
+        dopo = st.selectbox(
+            '🕒 Versione successiva',
+            successive,
+            index=len(successive) - 1,
+            format_func=formatta_istante,
+            key=f"dopo_movimenti_{ranking_file}_{prima}"
+        )
+
+    df = movimenti(ranking_file, prima, dopo)
+    conteggi = df['Stato'].value_counts()
+
+    # --- RIEPILOGO ---
+    colonne = st.columns(len(STATI))
+    for colonna, stato in zip(colonne, STATI):
+        colonna.metric(stato, int(conteggi.get(stato, 0)))
+
+    # --- DETTAGLIO ---
+    stati = st.multiselect(
+        '🔎 Mostra',
+        list(STATI),
+        default=['Nuovo', 'Salito', 'Sceso', 'Uscito'],
+        key="stati_movimenti"
+    )
+    df = df[df['Stato'].isin(stati)]
+    df = df.sort_values(by=['Stato', 'Δ Posizioni'], ascending=[True, False], na_position='last')
+    st.dataframe(df[COLONNE_MOVIMENTI].reset_index(drop=True), width='stretch')
@@ -1,11 +1,12 @@
 import streamlit as st
-import pandas as pd
-from modules.data_loader import carica_dati
-from config.settings import EXCEL_FILES, SHEET_NAME
-from pathlib import Path
-
-# Costante per il numero di risultati per pagina
-RISULTATI_PER_PAGINA = 10
+from modules.data_loader import carica_tutte
+from modules.business_logic import chiave_vista, classifica_societa_dataset, indice_ricerca
+from modules.cache_risultati import risultati
+from modules.metriche import fase
+from config.settings import EXCEL_FILES, RICERCA_TOLLERANTE, RISULTATI_PER_PAGINA, SHEET_NAME
+from views.components.cards import html_card_societa, mostra_card
+from views.components.esportazione import pulsanti_esportazione
+from views.components.lista_virtuale import mostra_lista_virtuale, payload_societa
 
 def classifica_societa():
     st.markdown("### 🏢 Classifica Società")
@@ -19,45 +20,19 @@ def classifica_societa():
         key="ranking_societa"
     )
 
-    # Caricamento dati con gestione errori per file mancanti
-    df = pd.DataFrame()
-    if ranking_file == 'Tutte':
-        dfs = []
-        for file in EXCEL_FILES.keys():
-            file_path = Path(EXCEL_FILES[file])
-            if not file_path.is_file():
-                st.warning(f"⚠️ Ranking {file} non presente.")
-                continue
-            try:
-                df_temp = carica_dati(file_path, sheet_name=SHEET_NAME)
-                dfs.append(df_temp)
-            except FileNotFoundError:
-                st.warning(f"⚠️ Ranking {file} non trovato.")
-        if dfs:
-            df = pd.concat(dfs, ignore_index=True)
-    else:
-        file_path = Path(EXCEL_FILES[ranking_file])
-        if not file_path.is_file():
-            st.warning(f"⚠️ Ranking {ranking_file} non presente.")
-        else:
-            try:
-                df = carica_dati(file_path, sheet_name=SHEET_NAME)
-            except FileNotFoundError:
-                st.warning(f"⚠️ Ranking {ranking_file} non trovato.")
-    
-    if df.empty:
+    # Caricamento di tutte le liste: gli aggregati per lista e complessivi si calcolano in un'unica passata
+    risultato = carica_tutte(sheet_name=SHEET_NAME)
+    mancanti = [m.ranking for m in risultato.mancanti if ranking_file in ('Tutte', m.ranking)]
+    if mancanti:
+        st.warning(f"⚠️ Ranking {', '.join(mancanti)} non presente.")
+    df = risultato.dati
+
+    if df.empty or (ranking_file != 'Tutte' and ranking_file in mancanti):
         st.info("Nessun dato disponibile.")
         return
 
-    # --- Raggruppamento per Società con Media Punti ---
-    df_societa = (
-        df.groupby(['Nazione', 'Società'])
-        .agg({'Punti': 'sum', 'Nome': 'count'})
-        .reset_index()
-        .rename(columns={'Nome': 'Numero Atleti', 'Punti': 'Punti Totali'})
-    )
-
-    df_societa['Media Punti'] = (df_societa['Punti Totali'] / df_societa['Numero Atleti']).round(2)
+    # --- Raggruppamento per Società con Media Punti (calcolato una volta per dataset) ---
+    classifica = classifica_societa_dataset(df)
 
     # --- FILTRO RICERCA SOCIETÀ ---
     ricerca_societa = st.text_input(
@@ -65,26 +40,34 @@ def classifica_societa():
         key="ricerca_societa", 
         on_change=lambda: st.session_state.update({"reset_pagina_societa": True})
     )
-    if ricerca_societa:
-        df_societa = df_societa[df_societa['Società'].str.contains(ricerca_societa, case=False, na=False)]
+    trovate = indice_ricerca(df, 'Società').valori_trovati(ricerca_societa, RICERCA_TOLLERANTE)
 
     # --- ORDINAMENTO CLASSIFICA ---
     ordinamento = st.selectbox(
         '🔄 Ordina per',
-        ['Punti Totali', 'Media Punti', 'Numero Atleti'],
+        list(classifica.ORDINAMENTI),
         key="ordinamento_societa",
         on_change=lambda: st.session_state.update({"reset_pagina_societa": True})
     )
+    # Posizioni della classifica condivise tra le sessioni (stessa lista, ricerca e ordinamento)
+    ordine = risultati.ottieni(
+        chiave_vista(risultato.versione, ranking_file, ricerca_nome=ricerca_societa) + ('societa', ordinamento),
+        lambda: classifica.ordine(ranking_file, ordinamento, trovate)
+    )
 
-    if ordinamento == 'Punti Totali':
-        df_societa = df_societa.sort_values(by='Punti Totali', ascending=False)
-    elif ordinamento == 'Media Punti':
-        df_societa = df_societa.sort_values(by='Media Punti', ascending=False)
-    elif ordinamento == 'Numero Atleti':
-        df_societa = df_societa.sort_values(by='Numero Atleti', ascending=False)
+    # --- ESPORTAZIONE (GENERATA SOLO AL DOWNLOAD) ---
+    pulsanti_esportazione(
+        (risultato.versione, ranking_file, ricerca_societa, ordinamento),
+        lambda: classifica.classifica(ranking_file, ordinamento, trovate, ordine=ordine),
+        "classifica_societa"
+    )
 
-    df_societa.reset_index(drop=True, inplace=True)
-    df_societa['Ranking'] = df_societa.index + 1
+    # --- SCORRIMENTO CONTINUO (PAGINAZIONE LATO BROWSER) ---
+    if st.toggle('📜 Scorrimento continuo', key="scorrimento_societa"):
+        df_societa = classifica.classifica(ranking_file, ordinamento, trovate, ordine=ordine)
+        st.caption(f"{len(df_societa)} società")
+        mostra_lista_virtuale(payload_societa(df_societa))
+        return
 
     # --- RESET PAGINAZIONE ---
     if 'reset_pagina_societa' not in st.session_state:
@@ -96,43 +79,17 @@ def classifica_societa():
     if 'pagina_corrente_societa' not in st.session_state:
         st.session_state.pagina_corrente_societa = 1
 
-    totale_risultati = len(df_societa)
-    totale_pagine = (totale_risultati - 1) // RISULTATI_PER_PAGINA + 1
-    
-    pagina_corrente = st.session_state.pagina_corrente_societa
-    pagina_corrente = max(1, min(pagina_corrente, totale_pagine))
-
-    inizio = (pagina_corrente - 1) * RISULTATI_PER_PAGINA
-    fine = inizio + RISULTATI_PER_PAGINA
-    df_paginato = df_societa.iloc[inizio:fine]
+    # La pagina richiesta è una fetta degli ordinamenti precalcolati
+    with fase('societa_pagina', righe=RISULTATI_PER_PAGINA):
+        df_paginato, pagina_corrente, totale_pagine = classifica.pagina(
+            ranking_file, ordinamento, trovate,
+            st.session_state.pagina_corrente_societa, RISULTATI_PER_PAGINA, ordine
+        )
+    st.session_state.pagina_corrente_societa = pagina_corrente
 
     # --- VISUALIZZAZIONE CLASSIFICA ---
-    st.markdown("<div class='classifica-container'>", unsafe_allow_html=True)
-    for _, row in df_paginato.iterrows():
-        posizione = f"#{row['Ranking']}"
-        nome_societa = row['Società']
-        punti_totali = row['Punti Totali']
-        numero_atleti = row['Numero Atleti']
-        media_punti = row['Media Punti']
-        nazione = row['Nazione'].lower()
-        flag_url = f"https://flagcdn.com/w40/{nazione}.png"
-
-        st.markdown(f"""
-            <div class='classifica-card'>
-                <div class='ranking'>{posizione}</div>
-                <div class='flag'>
-                    <img src='{flag_url}' alt='flag'>
-                </div>
-                <div class='details'>
-                    <span class='name'>{nome_societa}</span><br>
-                    <span class='category'>{numero_atleti} Atleti | Media punti per Atleta: {media_punti}</span>
-                </div>
-                <div class='points'>
-                    {punti_totali} Punti
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
+    with fase('societa_card', righe=len(df_paginato)):
+        mostra_card(html_card_societa(df_paginato))
 
     # --- NAVIGAZIONE PAGINAZIONE ---
     col1, col2 = st.columns([1, 1])
@@ -0,0 +1,80 @@
+import streamlit as st
+import plotly.express as px
+from modules.data_loader import COLONNA_LISTA, carica_tutte
+from modules.business_logic import chiave_vista, cubo_statistiche, ordine_per_colonna, posizioni_in_cache
+from config.settings import EXCEL_FILES, SHEET_NAME
+
+# Numero di atleti, società e nazioni mostrati
+TOP_N = 10
+# Colonne mostrate nella tabella dei migliori atleti
+COLONNE_ATLETI = ['Ranking', 'Nome', 'Categoria', 'Società', 'Nazione', 'Punti', COLONNA_LISTA]
+
+def _classifica_aggregata(cubo, dimensione, filtri, titolo):
+    """
+    Prime TOP_N voci della dimensione per Punti Totali, lette dal cubo delle statistiche
+    """
+    tabella = cubo.interroga([dimensione], filtri, ordina='Punti Totali', limite=TOP_N)
+    if tabella.empty:
+        st.info("Nessun dato disponibile.")
+        return
+    fig = px.bar(tabella, x=dimensione, y='Punti Totali', color=dimensione, title=titolo, text_auto=True,
+                 hover_data=['Numero Atleti', 'Media Punti', 'Punti Massimi'])
+    fig.update_layout(showlegend=False)
+    st.plotly_chart(fig, width='stretch')
+    st.dataframe(tabella, width='stretch', hide_index=True)
+
+
+def top_10():
+    st.markdown("### 🏅 Top 10")
+    st.divider()
+
+    # Selettore di Ranking List con l'aggiunta di "Tutte"
+    ranking_options = ['Tutte'] + list(EXCEL_FILES.keys())
+    ranking_file = st.selectbox(
+        '🏆 Seleziona una Ranking List',
+        ranking_options,
+        key="ranking_top10"
+    )
+
+    risultato = carica_tutte(None if ranking_file == 'Tutte' else [ranking_file], sheet_name=SHEET_NAME)
+    if risultato.mancanti:
+        elenco = ", ".join(mancante.ranking for mancante in risultato.mancanti)
+        st.warning(f"⚠️ Ranking {elenco} non presente.")
+    df = risultato.dati
+    if df.empty:
+        st.info("Nessun dato disponibile.")
+        return
+
+    # Aggregati calcolati una volta per versione dei dati: i filtri scelgono solo le celle del cubo
+    cubo = cubo_statistiche(df)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        sesso = st.selectbox('👫 Seleziona Sesso', ['Tutti', 'Maschi', 'Femmine'], key="sesso_top10")
+    with col2:
+        categorie = cubo.valori_presenti('Categoria', {'Sesso': sesso})
+        categoria = st.selectbox('🏷️ Seleziona Categoria', ['Tutte'] + categorie, key="categoria_top10")
+    filtri = {'Sesso': sesso, 'Categoria': categoria}
+
+    # --- MIGLIORI ATLETI: PRIMI N DELL'ORDINE PER PUNTI GIÀ CALCOLATO ---
+    st.markdown("#### 🥇 Atleti")
+    posizioni = posizioni_in_cache(chiave_vista(risultato.versione, ranking_file, sesso, categoria), df,
+                                   sesso, categoria)
+    migliori = df.take(ordine_per_colonna(df, 'Punti', decrescente=True).primi(TOP_N, posizioni))
+    if migliori.empty:
+        st.info("Nessun atleta per i filtri selezionati.")
+    else:
+        colonne = [colonna for colonna in COLONNE_ATLETI if colonna in migliori.columns]
+        if ranking_file != 'Tutte':
+            colonne.remove(COLONNA_LISTA)
+        fig = px.bar(migliori, x='Nome', y='Punti', color='Società', title=f'Top {TOP_N} Atleti', text_auto=True)
+        st.plotly_chart(fig, width='stretch')
+        st.dataframe(migliori[colonne].reset_index(drop=True), width='stretch', hide_index=True)
+
+    # --- SOCIETÀ E NAZIONI (DAL CUBO) ---
+    st.markdown("#### 🏢 Società")
+    _classifica_aggregata(cubo, 'Società', filtri, f'Top {TOP_N} Società per Punti Totali')
+
+    if len(cubo.valori_presenti('Nazione', filtri)) > 1:
+        st.markdown("#### 🌍 Nazioni")
+        _classifica_aggregata(cubo, 'Nazione', filtri, f'Top {TOP_N} Nazioni per Punti Totali')